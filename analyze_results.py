@@ -1,8 +1,8 @@
-import json
+from json_utils import loads
 
 # Load results
-with open('results_all.json') as f:
-    data = json.load(f)
+with open('results_all.json', 'rb') as f:
+    data = loads(f.read())
 
 # Leaderboard
 print("=" * 70)
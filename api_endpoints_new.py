@@ -8,13 +8,14 @@ Integrate these into app.py or use as reference for implementation.
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException
 from typing import List, Dict, Optional
 from pydantic import BaseModel
-import tempfile
-import os
+import asyncio
+from collections import Counter
 
 # Import existing utilities
-from docx_utils import collect_word_numbered_bullets
+from docx_utils import load_docx, collect_word_numbered_bullets
 from llm_utils import (
     embed,
+    embed_many,
     extract_facts_from_qa,
     generate_bullet_self_critique,
     generate_followup_questions,
@@ -23,7 +24,6 @@ from llm_utils import (
 from db_utils import (
     store_user_bullet,
     get_user_bullet,
-    match_bullet_with_confidence,
     store_bullet_facts,
     get_bullet_facts,
     confirm_bullet_facts,
@@ -35,6 +35,7 @@ from db_utils import (
 )
 from db_utils_optimized import match_bullet_with_confidence_optimized
 from config import log
+from caps import bounded
 
 # Create router
 router = APIRouter(prefix="/v2", tags=["Resume Optimizer V2"])
@@ -107,20 +108,13 @@ async def start_onboarding(
         OnboardingStartResponse with session_id, bullets, and match information
     """
     try:
-        # Save uploaded file temporarily
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".docx") as tmp:
-            content = await resume_file.read()
-            tmp.write(content)
-            tmp_path = tmp.name
+        # Parse the upload in memory
+        content = await resume_file.read()
 
         # Extract bullets from resume
-        from docx import Document
-        doc = Document(tmp_path)
+        doc = load_docx(content)
         bullets, _ = collect_word_numbered_bullets(doc)
 
-        # Clean up temp file
-        os.unlink(tmp_path)
-
         if not bullets:
             raise HTTPException(status_code=400, detail="No bullets found in resume")
 
@@ -133,12 +127,14 @@ async def start_onboarding(
 
         # Match each bullet against existing bullets
         bullet_matches = []
+        # Embed every bullet in one request
+        embeddings = embed_many(bullets)
         for idx, bullet in enumerate(bullets):
-            # Generate embedding for matching
-            embedding = embed(bullet)
+            # Embedding for matching
+            embedding = embeddings[idx].tolist()
 
-            # Match bullet with confidence
-            match_result = match_bullet_with_confidence(user_id, bullet, embedding)
+            # Match bullet with confidence (database-side vector search, Python fallback on error)
+            match_result = match_bullet_with_confidence_optimized(user_id, bullet, embedding)
 
             # Check if matched bullet has facts
             has_facts = False
@@ -156,11 +152,12 @@ async def start_onboarding(
                 has_facts=has_facts
             ))
 
-        # Count match types
-        exact_matches = sum(1 for m in bullet_matches if m.match_type == "exact")
-        high_conf = sum(1 for m in bullet_matches if m.match_type == "high_confidence")
-        medium_conf = sum(1 for m in bullet_matches if m.match_type == "medium_confidence")
-        new_bullets = sum(1 for m in bullet_matches if m.match_type == "no_match")
+        # Count match types in one pass
+        counts = Counter(m.match_type for m in bullet_matches)
+        exact_matches = counts["exact"]
+        high_conf = counts["high_confidence"]
+        medium_conf = counts["medium_confidence"]
+        new_bullets = counts["no_match"]
 
         message = (
             f"Found {len(bullets)} bullets. "
@@ -372,23 +369,18 @@ async def match_bullets_for_job(
     """
     try:
         # Extract bullets from resume (same as onboarding)
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".docx") as tmp:
-            content = await resume_file.read()
-            tmp.write(content)
-            tmp_path = tmp.name
-
-        from docx import Document
-        doc = Document(tmp_path)
+        content = await resume_file.read()
+        doc = load_docx(content)
         bullets, _ = collect_word_numbered_bullets(doc)
-        os.unlink(tmp_path)
 
         if not bullets:
             raise HTTPException(status_code=400, detail="No bullets found in resume")
 
-        # Match each bullet
+        # Match each bullet (all bullets embedded in one request)
         matches = []
+        embeddings = embed_many(bullets)
         for idx, bullet in enumerate(bullets):
-            embedding = embed(bullet)
+            embedding = embeddings[idx].tolist()
             match_result = match_bullet_with_confidence_optimized(user_id, bullet, embedding)
 
             # Get facts if match found
@@ -430,15 +422,12 @@ async def generate_resume_with_facts(
         BulletGenerationResponse with enhanced bullets
     """
     try:
-        # For each bullet, try to find stored facts
-        enhanced_bullets = []
-        with_facts = []
-        without_facts = []
-
-        for idx, bullet in enumerate(request.bullets):
+        # For each bullet, try to find stored facts. Bullets are independent, so match + generate
+        # them concurrently; the helpers are blocking, so each runs in a worker thread.
+        async def process_bullet(idx: int, bullet: str, embedding: List[float]):
             # Try to match bullet
-            embedding = embed(bullet)
-            match_result = match_bullet_with_confidence_optimized(
+            match_result = await asyncio.to_thread(
+                match_bullet_with_confidence_optimized,
                 request.user_id,
                 bullet,
                 embedding
@@ -447,25 +436,34 @@ async def generate_resume_with_facts(
             # Get facts if matched
             facts = None
             if match_result["bullet_id"]:
-                fact_records = get_bullet_facts(match_result["bullet_id"], confirmed_only=True)
+                fact_records = await asyncio.to_thread(get_bullet_facts, match_result["bullet_id"], confirmed_only=True)
                 if fact_records:
                     facts = fact_records[0]["facts"]
 
             if facts:
                 # Generate with facts
-                enhanced = generate_bullet_self_critique(
+                enhanced = await asyncio.to_thread(
+                    generate_bullet_self_critique,
                     bullet,
                     request.job_description,
                     facts
                 )
-                enhanced_bullets.append(enhanced)
-                with_facts.append(idx)
                 log.info(f"Generated bullet {idx} with stored facts")
-            else:
-                # Fallback to original bullet (or could use basic rewrite)
-                enhanced_bullets.append(bullet)
-                without_facts.append(idx)
-                log.info(f"Bullet {idx} has no stored facts, using original")
+                return enhanced, True
+
+            # Fallback to original bullet (or could use basic rewrite)
+            log.info(f"Bullet {idx} has no stored facts, using original")
+            return bullet, False
+
+        embeddings = await asyncio.to_thread(embed_many, request.bullets)
+        results = await asyncio.gather(*[
+            bounded(process_bullet(idx, bullet, embeddings[idx].tolist()))
+            for idx, bullet in enumerate(request.bullets)
+        ])
+
+        enhanced_bullets = [enhanced for enhanced, _ in results]
+        with_facts = [idx for idx, (_, used_facts) in enumerate(results) if used_facts]
+        without_facts = [idx for idx, (_, used_facts) in enumerate(results) if not used_facts]
 
         return BulletGenerationResponse(
             enhanced_bullets=enhanced_bullets,
@@ -1,4 +1,4 @@
-import os, hashlib, base64, tempfile
+import hashlib, base64, asyncio
 from typing import Optional, List
 from fastapi import FastAPI, UploadFile, File, Form, Body, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
@@ -7,12 +7,20 @@ from pydantic import BaseModel
 from config import log, health, supabase
 from docx_utils import load_docx, collect_word_numbered_bullets, set_paragraph_text_with_selective_links, enforce_single_page
 from llm_utils import should_ask_more_questions
-from caps import tiered_char_cap, enforce_char_cap_with_reprompt
+from caps import tiered_char_cap, enforce_char_cap_with_reprompt, bounded
 from scoring import composite_score
 from db_utils import (create_qa_session, get_qa_session, store_qa_pair, update_qa_answer,
                       get_session_qa_pairs, get_user_context, store_user_context,
                       update_session_status, get_answered_qa_pairs)
 
+# Accepted upload content types for resume files
+_DOCX_CTYPES = frozenset({"application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+                          "application/octet-stream", "application/msword"})
+
+def _looks_like_docx(raw: bytes) -> bool:
+    """Cheap pre-flight before python-docx: a DOCX is a zip, so it starts with a local file header
+    and ends with an end-of-central-directory record (within the max 64 KB zip comment)."""
+    return raw.startswith(b"PK\x03\x04") and raw.rfind(b"PK\x05\x06", -(65535 + 22)) != -1
 
 # Helper function for robust hex/base64 decoding
 def decode_base64(data: str) -> bytes:
@@ -574,9 +582,8 @@ async def match_bullets_for_job(
     try:
         import uuid
         from db_utils_optimized import match_bullet_with_confidence_optimized
-        from llm_utils import embed
+        from llm_utils import embed_many
         from db_utils import get_bullet_facts
-        from docx import Document
 
         # Generate session ID for this job application
         session_id = str(uuid.uuid4())
@@ -629,13 +636,8 @@ async def match_bullets_for_job(
             log.info(f"Loaded base resume from database ({len(content)} bytes)")
 
         # Extract bullets from resume
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".docx") as tmp:
-            tmp.write(content)
-            tmp_path = tmp.name
-
-        doc = Document(tmp_path)
+        doc = load_docx(content)
         bullets, _ = collect_word_numbered_bullets(doc)
-        os.unlink(tmp_path)
 
         if not bullets:
             raise HTTPException(status_code=400, detail="No bullets found in resume")
@@ -647,10 +649,11 @@ async def match_bullets_for_job(
         if len(bullets) > 3:
             log.info(f"... and {len(bullets) - 3} more bullets")
 
-        # Match each bullet
+        # Match each bullet (all bullets embedded in one request)
         matches = []
+        embeddings = embed_many(bullets)
         for idx, bullet in enumerate(bullets):
-            embedding = embed(bullet)
+            embedding = embeddings[idx].tolist()
             match_result = match_bullet_with_confidence_optimized(user_id, bullet, embedding)
 
             # Get facts if match found
@@ -696,7 +699,6 @@ async def generate_resume_with_facts(request: BulletGenerationRequest):
     log.info(f"/v2/apply/generate_with_facts called for user {request.user_id} with {len(request.bullets)} bullets")
 
     try:
-        import asyncio
         from db_utils_optimized import match_bullet_with_confidence_optimized
         from llm_utils import embed, generate_bullet_metrics_and_tools_async, optimize_keywords_light_touch_async
         from db_utils import get_bullet_facts
@@ -719,9 +721,12 @@ async def generate_resume_with_facts(request: BulletGenerationRequest):
             else:
                 # Use provided bullet_id if available, otherwise match
                 bullet_id = bullet_item.bullet_id
+                # embed/match/get_bullet_facts are blocking network calls; run them in worker
+                # threads so the gathered bullets actually overlap instead of stalling the event loop
                 if not bullet_id:
-                    embedding = embed(bullet_text)
-                    match_result = match_bullet_with_confidence_optimized(
+                    embedding = await asyncio.to_thread(embed, bullet_text)
+                    match_result = await asyncio.to_thread(
+                        match_bullet_with_confidence_optimized,
                         request.user_id,
                         bullet_text,
                         embedding
@@ -731,7 +736,7 @@ async def generate_resume_with_facts(request: BulletGenerationRequest):
                 # Get facts if we have a bullet_id
                 facts = None
                 if bullet_id:
-                    fact_records = get_bullet_facts(bullet_id, confirmed_only=True)
+                    fact_records = await asyncio.to_thread(get_bullet_facts, bullet_id, confirmed_only=True)
                     if fact_records:
                         facts = fact_records[0]["facts"]
 
@@ -761,7 +766,7 @@ async def generate_resume_with_facts(request: BulletGenerationRequest):
 
         # Process all bullets in parallel using asyncio.gather()
         log.info(f"Starting parallel processing of {len(request.bullets)} bullets...")
-        tasks = [process_bullet(idx, bullet_item) for idx, bullet_item in enumerate(request.bullets)]
+        tasks = [bounded(process_bullet(idx, bullet_item)) for idx, bullet_item in enumerate(request.bullets)]
         enhanced_bullets = await asyncio.gather(*tasks)
 
         # Count facts usage
@@ -822,7 +827,6 @@ async def generate_keywords_only(request: BulletGenerationRequest):
     log.info(f"/v2/apply/generate_keywords_only called for user {request.user_id} with {len(request.bullets)} bullets")
 
     try:
-        import asyncio
         from llm_utils import optimize_keywords_light_touch_async, deduplicate_repeated_words
 
         # Step 1: Optimize all bullets in parallel for keywords
@@ -831,7 +835,7 @@ async def generate_keywords_only(request: BulletGenerationRequest):
 
         # Create tasks for parallel processing
         tasks = [
-            optimize_keywords_light_touch_async(bullet_text, request.job_description)
+            bounded(optimize_keywords_light_touch_async(bullet_text, request.job_description))
             for bullet_text in original_bullets_list
         ]
 
@@ -1299,8 +1303,9 @@ async def upload(file: UploadFile = File(...), user_id: str = Form(...)):
     bullets, paras = collect_word_numbered_bullets(doc)
 
     # Log all paragraphs for debugging
-    log.info(f"Document has {len(doc.paragraphs)} paragraphs total")
-    for i, p in enumerate(doc.paragraphs[:10]):  # Log first 10 paragraphs
+    all_paras = doc.paragraphs  # python-docx rebuilds this list on every access
+    log.info(f"Document has {len(all_paras)} paragraphs total")
+    for i, p in enumerate(all_paras[:10]):  # Log first 10 paragraphs
         log.info(f"Para {i}: '{p.text[:100]}'")
 
     if not bullets:
@@ -1334,8 +1339,10 @@ async def rewrite(file: UploadFile = File(...), job_description: str = Form(...)
     raw = await file.read()
     size = len(raw); ct = file.content_type; sha = hashlib.sha256(raw).hexdigest()
     if not raw or size < 512: return JSONResponse({"error":"empty_or_small_file"}, status_code=400)
-    if ct not in {"application/vnd.openxmlformats-officedocument.wordprocessingml.document","application/octet-stream","application/msword"}:
+    if ct not in _DOCX_CTYPES:
         return JSONResponse({"error":"bad_content_type","got":ct}, status_code=415)
+    if not _looks_like_docx(raw):
+        return JSONResponse({"error":"bad_docx","detail":"not a DOCX (zip) archive"}, status_code=400)
     try:
         doc = load_docx(raw)
     except Exception as e:
@@ -1373,8 +1380,10 @@ async def rewrite_json(file: UploadFile = File(...), job_description: str = Form
     size = len(raw); ct = file.content_type; sha = hashlib.sha256(raw).hexdigest()
     log.info(f"/rewrite_json recv file='{file.filename}' size={size} sha256={sha}")
     if not raw or size < 512: return JSONResponse({"error":"empty_or_small_file"}, status_code=400)
-    if ct not in {"application/vnd.openxmlformats-officedocument.wordprocessingml.document","application/octet-stream","application/msword"}:
+    if ct not in _DOCX_CTYPES:
         return JSONResponse({"error":"bad_content_type","got":ct}, status_code=415)
+    if not _looks_like_docx(raw):
+        return JSONResponse({"error":"bad_docx","detail":"not a DOCX (zip) archive"}, status_code=400)
     try:
         doc = load_docx(raw)
     except Exception as e:
@@ -1451,10 +1460,12 @@ async def generate_questions(file: UploadFile = File(...), job_description: str
     if not raw or size < 512:
         return JSONResponse({"error": "empty_or_small_file"}, status_code=400)
 
-    if ct not in {"application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-                  "application/octet-stream", "application/msword"}:
+    if ct not in _DOCX_CTYPES:
         return JSONResponse({"error": "bad_content_type", "got": ct}, status_code=415)
 
+    if not _looks_like_docx(raw):
+        return JSONResponse({"error": "bad_docx", "detail": "not a DOCX (zip) archive"}, status_code=400)
+
     # Parse DOCX
     try:
         doc = load_docx(raw)
@@ -1711,10 +1722,12 @@ async def generate_results(file: UploadFile = File(...), session_id: str = Form(
     if not raw or size < 512:
         return JSONResponse({"error": "empty_or_small_file"}, status_code=400)
 
-    if ct not in {"application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-                  "application/octet-stream", "application/msword"}:
+    if ct not in _DOCX_CTYPES:
         return JSONResponse({"error": "bad_content_type", "got": ct}, status_code=415)
 
+    if not _looks_like_docx(raw):
+        return JSONResponse({"error": "bad_docx", "detail": "not a DOCX (zip) archive"}, status_code=400)
+
     # Parse DOCX
     try:
         doc = load_docx(raw)
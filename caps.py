@@ -1,5 +1,14 @@
+import asyncio
 from typing import Optional
-from config import REPROMPT_TRIES, CHAT_MODEL, client, log
+from config import REPROMPT_TRIES, CHAT_MODEL, BULLET_CONCURRENCY, client, log
+
+# One semaphore per worker process, shared by every router (app.py and the v2 endpoints),
+# so concurrent requests can't multiply the number of in-flight per-bullet LLM calls
+_bullet_slots = asyncio.Semaphore(BULLET_CONCURRENCY)
+
+async def bounded(coro):
+    async with _bullet_slots:
+        return await coro
 
 def tiered_char_cap(orig_len: int, override: Optional[int] = None) -> int:
     if override and override > 0: return override
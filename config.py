@@ -19,6 +19,10 @@ ANTHROPIC_KEY = os.environ.get("ANTHROPIC_API_KEY")
 client = Anthropic(api_key=ANTHROPIC_KEY) if ANTHROPIC_KEY else None
 async_client = AsyncAnthropic(api_key=ANTHROPIC_KEY) if ANTHROPIC_KEY else None
 CHAT_MODEL = os.getenv("CHAT_MODEL", "claude-sonnet-4-5-20250929")
+# Generation stays on the stronger model; critique/select/extract sub-steps are
+# simple classification tasks and run on the cheaper, lower-latency model.
+GEN_MODEL = os.getenv("GEN_MODEL") or CHAT_MODEL  # empty = CHAT_MODEL
+CRITIQUE_MODEL = os.getenv("CRITIQUE_MODEL", "claude-haiku-4-5")
 
 # --- OpenAI (for embeddings only) ---
 OPENAI_KEY = os.environ.get("OPENAI_API_KEY")
@@ -43,9 +47,30 @@ else:
 USE_LLM_TERMS = os.getenv("USE_LLM_TERMS", "1") == "1"
 USE_DISTILLED_JD = os.getenv("USE_DISTILLED_JD", "1") == "1"
 W_DISTILLED = float(os.getenv("W_DISTILLED", "0.7"))
+# Bullet matching RPC: 1 ranks unit-length embeddings by inner product (<#>, no per-row norms); 0 = cosine (<=>)
+USE_INNER_PRODUCT_SEARCH = os.getenv("USE_INNER_PRODUCT_SEARCH", "0") == "1"
+
+# --- Multi-stage strategies ---
+# "fused" runs generate/critique/revise in one structured call; "sequential" keeps the 3-call path for A/B.
+MULTI_STAGE_STRATEGY = os.getenv("MULTI_STAGE_STRATEGY", "fused")
+FUSED_THINKING_BUDGET = int(os.getenv("FUSED_THINKING_BUDGET", "0"))  # >0 enables extended thinking
+# "tool" forces submit_bullets for batch output; "delimiter" parses <<<BULLET>>>-separated plain text.
+BATCH_OUTPUT_FORMAT = os.getenv("BATCH_OUTPUT_FORMAT", "tool")
+
+# --- LLM response cache ---
+LLM_CACHE_DIR = os.getenv("LLM_CACHE_DIR", "")  # empty = memory only (API default); set for evaluation runs, no eviction on disk
+LLM_CACHE_MAX_TEMPERATURE = float(os.getenv("LLM_CACHE_MAX_TEMPERATURE", "0.2"))
+USE_SEMANTIC_LLM_CACHE = os.getenv("USE_SEMANTIC_LLM_CACHE", "0") == "1"
+LLM_CACHE_SIM_THRESHOLD = float(os.getenv("LLM_CACHE_SIM_THRESHOLD", "0.98"))
+EMBED_CACHE_DIR = os.getenv("EMBED_CACHE_DIR", ".embed_cache")  # float32 vectors per EMBED_MODEL; empty = memory only
+# Anthropic ignores cache_control on prefixes shorter than this (1024 for Sonnet/Opus, 2048 for Haiku)
+PROMPT_CACHE_MIN_TOKENS = int(os.getenv("PROMPT_CACHE_MIN_TOKENS", "1024"))
+PROMPT_OPT_CACHE_DIR = os.getenv("PROMPT_OPT_CACHE_DIR", ".prompt_opt_cache")  # optimize_prompts suggestions; empty = no cache
 
 # --- Caps and retries ---
 REPROMPT_TRIES = int(os.getenv("REPROMPT_TRIES", "3"))
+# Max bullets processed concurrently per worker; bounds in-flight LLM calls so large resumes don't trip rate limits
+BULLET_CONCURRENCY = max(1, int(os.getenv("BULLET_CONCURRENCY", "8")))
 
 # --- Scoring weights ---
 W_EMB = float(os.getenv("W_EMB", "0.4"))
@@ -61,7 +86,7 @@ def health():
         "anthropic": bool(ANTHROPIC_KEY),
         "openai_embeddings": bool(OPENAI_KEY),
         "supabase": bool(supabase),
-        "models": {"embed": EMBED_MODEL, "chat": CHAT_MODEL},
+        "models": {"embed": EMBED_MODEL, "chat": CHAT_MODEL, "gen": GEN_MODEL, "critique": CRITIQUE_MODEL},
         "weights": {"emb": W_EMB, "keywords": W_KEY, "llm": W_LLM, "semantic_distilled_weight": W_DISTILLED},
         "features": {"use_llm_terms": USE_LLM_TERMS, "use_distilled_jd": USE_DISTILLED_JD},
         "reprompt_tries": REPROMPT_TRIES,
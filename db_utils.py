@@ -1,6 +1,7 @@
 """Database utilities for Q&A session management with Supabase."""
 
 import hashlib
+import numpy as np
 from typing import Dict, List, Optional, Any
 from datetime import datetime
 from config import supabase, log
@@ -292,6 +293,13 @@ def get_answered_qa_pairs(session_id: str) -> List[Dict[str, str]]:
 # Bullet Management Functions (for persistent bullet storage)
 # =====================================================================
 
+def normalize_embedding(embedding: List[float]) -> List[float]:
+    """Scale an embedding to unit length so inner-product search (<#>) ranks like cosine."""
+    v = np.asarray(embedding, dtype=np.float32)
+    norm = float(np.linalg.norm(v))
+    return (v / norm).tolist() if norm else list(embedding)
+
+
 def store_user_bullet(user_id: str, bullet_text: str, embedding: List[float],
                      source_resume: Optional[str] = None) -> Optional[str]:
     """
@@ -319,7 +327,7 @@ def store_user_bullet(user_id: str, bullet_text: str, embedding: List[float],
             # Update existing bullet
             log.info(f"Bullet already exists: {existing_id}, updating embedding")
             update_data = {
-                "bullet_embedding": embedding,
+                "bullet_embedding": normalize_embedding(embedding),
                 "updated_at": "now()"
             }
             if source_resume:
@@ -338,7 +346,7 @@ def store_user_bullet(user_id: str, bullet_text: str, embedding: List[float],
             data = {
                 "user_id": user_id,
                 "bullet_text": bullet_text,
-                "bullet_embedding": embedding,
+                "bullet_embedding": normalize_embedding(embedding),
                 "source_resume_name": source_resume
             }
 
@@ -461,39 +469,32 @@ def find_similar_bullets(user_id: str, bullet_text: str, embedding: List[float],
         if not result.data:
             return []
 
-        # Calculate cosine similarity in Python
-        import numpy as np
-
-        def cosine_similarity(vec1: List[float], vec2: List[float]) -> float:
-            """Calculate cosine similarity between two vectors."""
-            if not vec1 or not vec2:
-                return 0.0
-            a = np.array(vec1)
-            b = np.array(vec2)
-            return float(np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b)))
-
-        matches = []
-        for bullet in result.data:
-            if bullet.get("bullet_embedding"):
-                similarity = cosine_similarity(embedding, bullet["bullet_embedding"])
-                if similarity >= threshold:
-                    matches.append({
-                        "id": bullet["id"],
-                        "bullet_text": bullet["bullet_text"],
-                        "similarity_score": similarity
-                    })
-
-        # Sort by similarity descending
-        matches.sort(key=lambda x: x["similarity_score"], reverse=True)
-
-        return matches[:limit]
+        # Calculate cosine similarity in Python: stack the stored embeddings into one (N, D)
+        # matrix and score them all with a single matrix-vector product
+        rows = [bullet for bullet in result.data if bullet.get("bullet_embedding")]
+        if not rows or not embedding:
+            return []
+        E = np.asarray([bullet["bullet_embedding"] for bullet in rows], dtype=np.float32)
+        # Normalize the query once; only the stored rows still need their norms divided out
+        q = np.asarray(embedding, dtype=np.float32)
+        q = q / max(float(np.linalg.norm(q)), 1e-12)
+        sims = (E @ q) / np.maximum(np.linalg.norm(E, axis=1), 1e-12)
+
+        # Highest similarity first; a single best match (match_bullet_with_confidence) is just an argmax
+        top = [int(np.argmax(sims))] if limit == 1 else np.argsort(-sims, kind="stable")[:limit]
+        return [{
+            "id": rows[i]["id"],
+            "bullet_text": rows[i]["bullet_text"],
+            "similarity_score": float(sims[i])
+        } for i in top if sims[i] >= threshold]
 
     except Exception as e:
         log.exception(f"Error finding similar bullets: {e}")
         return []
 
 
-def match_bullet_with_confidence(user_id: str, bullet_text: str, embedding: List[float]) -> Dict[str, Any]:
+def match_bullet_with_confidence(user_id: str, bullet_text: str,
+                                 embedding: Optional[List[float]] = None) -> Dict[str, Any]:
     """
     Match a bullet and return confidence level based on similarity.
 
@@ -506,7 +507,8 @@ def match_bullet_with_confidence(user_id: str, bullet_text: str, embedding: List
     Args:
         user_id: User identifier
         bullet_text: The bullet text to match
-        embedding: Vector embedding of the bullet
+        embedding: Vector embedding of the bullet. If omitted it is computed only
+            when there is no exact match, so exact matches cost no embedding call.
 
     Returns:
         Dict with match information:
@@ -528,6 +530,10 @@ def match_bullet_with_confidence(user_id: str, bullet_text: str, embedding: List
             "existing_bullet_text": bullet_data.get("bullet_text") if bullet_data else None
         }
 
+    if embedding is None:
+        from llm_utils import embed
+        embedding = embed(bullet_text)
+
     # Check for similar matches
     similar_bullets = find_similar_bullets(user_id, bullet_text, embedding, threshold=0.85, limit=1)
 
@@ -571,7 +577,7 @@ def update_bullet_embedding(bullet_id: str, embedding: List[float]) -> bool:
 
     try:
         result = (supabase.table("user_bullets")
-                 .update({"bullet_embedding": embedding})
+                 .update({"bullet_embedding": normalize_embedding(embedding)})
                  .eq("id", bullet_id)
                  .execute())
 
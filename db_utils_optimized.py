@@ -6,10 +6,14 @@ database-side vector operations for better performance.
 
 To use these optimized functions, simply replace the import:
     from db_utils_optimized import find_similar_bullets
+
+The find_similar_bullets database function and its HNSW index are defined in
+supabase_vector_search.sql; the inner-product variant selected with
+USE_INNER_PRODUCT_SEARCH is in supabase_vector_search_ip.sql.
 """
 
-from typing import Dict, List, Any
-from config import supabase, log
+from typing import Dict, List, Optional, Any
+from config import supabase, USE_INNER_PRODUCT_SEARCH, log
 
 
 def find_similar_bullets_rpc(user_id: str, embedding: List[float],
@@ -34,13 +38,15 @@ def find_similar_bullets_rpc(user_id: str, embedding: List[float],
         log.warning("Supabase not configured. Cannot search similar bullets.")
         return []
 
+    from db_utils import normalize_embedding
+
     try:
         # Call the PostgreSQL function via Supabase RPC
         result = supabase.rpc(
-            'find_similar_bullets',
+            'find_similar_bullets_ip' if USE_INNER_PRODUCT_SEARCH else 'find_similar_bullets',
             {
                 'p_user_id': user_id,
-                'p_embedding': embedding,
+                'p_embedding': normalize_embedding(embedding),
                 'p_threshold': threshold,
                 'p_limit': limit
             }
@@ -70,7 +76,7 @@ def find_similar_bullets_rpc(user_id: str, embedding: List[float],
 
 
 def match_bullet_with_confidence_optimized(user_id: str, bullet_text: str,
-                                          embedding: List[float]) -> Dict[str, Any]:
+                                          embedding: Optional[List[float]] = None) -> Dict[str, Any]:
     """
     Optimized version of match_bullet_with_confidence using RPC function.
 
@@ -80,7 +86,7 @@ def match_bullet_with_confidence_optimized(user_id: str, bullet_text: str,
     Args:
         user_id: User identifier
         bullet_text: The bullet text to match
-        embedding: Vector embedding of the bullet
+        embedding: Vector embedding of the bullet (computed after an exact-match miss if omitted)
 
     Returns:
         Dict with match information (see db_utils.match_bullet_with_confidence)
@@ -98,6 +104,10 @@ def match_bullet_with_confidence_optimized(user_id: str, bullet_text: str,
             "existing_bullet_text": bullet_data.get("bullet_text") if bullet_data else None
         }
 
+    if embedding is None:
+        from llm_utils import embed
+        embedding = embed(bullet_text)
+
     # Use optimized RPC-based similarity search
     similar_bullets = find_similar_bullets_rpc(user_id, embedding, threshold=0.85, limit=1)
 
@@ -128,12 +138,10 @@ def match_bullet_with_confidence_optimized(user_id: str, bullet_text: str,
 # Example usage:
 if __name__ == "__main__":
     # This demonstrates how to use the optimized functions
-    from llm_utils import embed
 
-    # Example: Match a bullet
+    # Example: Match a bullet (the embedding is only computed if there is no exact match)
     user_id = "user123"
     bullet_text = "Led team of 5 engineers to build microservices platform"
-    embedding = embed(bullet_text)
 
-    result = match_bullet_with_confidence_optimized(user_id, bullet_text, embedding)
+    result = match_bullet_with_confidence_optimized(user_id, bullet_text)
     print(f"Match result: {result}")
@@ -9,6 +9,7 @@ from docx.enum.section import WD_SECTION_START
 from config import BULLET_CHARS
 
 W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+_NUM_ID_XPATH = "./w:pPr/w:numPr/w:numId/@w:val"  # Word list numbering on a paragraph
 
 def load_docx(raw: bytes) -> Document:
     return Document(BytesIO(raw))
@@ -101,9 +102,10 @@ def enforce_single_page(doc: Document):
             doc.sections[-1].start_type = WD_SECTION_START.CONTINUOUS
     except Exception:
         pass
-    def _body_p(): return body.findall(f"./{{{W_NS}}}p")
-    while len(_body_p())>1 and not doc.paragraphs[-1].text.strip():
-        body.remove(doc.paragraphs[-1]._element)
+    # Trim trailing empty paragraphs; build the paragraph list once instead of per iteration
+    paras = doc.paragraphs
+    while len(paras)>1 and not paras[-1].text.strip():
+        body.remove(paras.pop()._element)
 
 def collect_word_numbered_bullets(doc: Document) -> Tuple[List[str], List]:
     """
@@ -117,20 +119,15 @@ def collect_word_numbered_bullets(doc: Document) -> Tuple[List[str], List]:
     """
     bullets, paras = [], []
     def _is_numbered(p):
-        pPr = p._p.pPr
-        return (
-            (pPr is not None)
-            and (getattr(pPr, "numPr", None) is not None)
-            and (getattr(pPr.numPr, "numId", None) is not None)
-            and (getattr(pPr.numPr.numId, "val", None) is not None)
-        )
+        # One lxml query for pPr/numPr/numId@val instead of a chain of Python attribute lookups
+        return bool(p._p.xpath(_NUM_ID_XPATH))
 
     # Process paragraphs
     for p in doc.paragraphs:
         t = (p.text or "").strip()
         if not t: continue
 
-        is_glyph = t and t[0] in BULLET_CHARS
+        is_glyph = t[0] in BULLET_CHARS  # t is non-empty here; set lookup is O(1)
         is_numbered_list = _is_numbered(p)
 
         # Standard bullet detection
@@ -19,12 +19,12 @@ Usage:
 """
 
 import csv
-import json
 import sys
 import argparse
 from typing import Dict, List, Any
 from datetime import datetime
 from config import client, CHAT_MODEL, log
+from json_utils import dump_pretty
 from llm_utils import (
     optimize_keywords_simple,
     optimize_keywords_targeted,
@@ -587,8 +587,7 @@ def save_keyword_results(results_by_approach: Dict[str, List[Dict]], output_path
             'results': results
         }
 
-    with open(output_path, 'w') as f:
-        json.dump(output_data, f, indent=2)
+    dump_pretty(output_data, output_path)
 
     print(f"Detailed results saved to: {output_path}")
 
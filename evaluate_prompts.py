@@ -9,15 +9,16 @@ Usage:
     python evaluate_prompts.py
     python evaluate_prompts.py --save results.json
     python evaluate_prompts.py --verbose
+    python evaluate_prompts.py --approach experimental --single-call
 """
 
 import csv
-import json
 import sys
 import argparse
 from typing import Dict, List, Any
 from datetime import datetime
 from config import client, CHAT_MODEL, log
+from json_utils import dump_pretty
 from llm_utils import (
     generate_bullet_with_facts,
     generate_bullet_with_facts_scaffolded,
@@ -27,8 +28,10 @@ from llm_utils import (
     generate_bullet_jd_mirror,
     generate_bullet_combined,
     generate_bullets_batch,
+    generate_bullet_all_strategies,
+    STRATEGY_NAMES,
 )
-from json import loads
+from json import loads, dumps
 import re
 
 
@@ -261,13 +264,33 @@ def compare_bullets(
     }
 
 
-def run_evaluation(bullets_csv: str = "bullets.csv", jobs_csv: str = "jobs.csv", verbose: bool = False, approach: str = "all") -> Dict[str, List[Dict]]:
+def single_call_generators() -> Dict[str, Any]:
+    """
+    Generators for STRATEGY_NAMES backed by one generate_bullet_all_strategies call per
+    (bullet, JD); the first strategy to see a pair makes the call, the rest reuse it.
+    """
+    fanout: Dict[tuple, Dict[str, str]] = {}
+
+    def make(name: str):
+        def generator(bullet_text: str, jd_text: str, facts: Dict, char_limit=None) -> str:
+            key = (bullet_text, jd_text, dumps(facts or {}, sort_keys=True, default=str), char_limit)
+            if key not in fanout:
+                fanout[key] = generate_bullet_all_strategies(bullet_text, jd_text, facts, char_limit)
+            return fanout[key][name]
+        return generator
+
+    return {name: make(name) for name in STRATEGY_NAMES}
+
+
+def run_evaluation(bullets_csv: str = "bullets.csv", jobs_csv: str = "jobs.csv", verbose: bool = False, approach: str = "all",
+                   single_call: bool = False) -> Dict[str, List[Dict]]:
     """
     Run full evaluation across all bullets and job types.
 
     Args:
         approach: "single", "scaffolded", "self_critique", "multi_candidate",
                   "hiring_manager", "jd_mirror", "all", or "experimental" (new 4 only)
+        single_call: Generate all STRATEGY_NAMES outputs with one call per bullet/JD pair
 
     Returns:
         Dict with results per approach
@@ -327,6 +350,10 @@ def run_evaluation(bullets_csv: str = "bullets.csv", jobs_csv: str = "jobs.csv",
         if approach in ["scaffolded", "both"]:
             approaches_to_test.append(("scaffolded", generate_bullet_with_facts_scaffolded))
 
+    if single_call:
+        fanned = single_call_generators()
+        approaches_to_test = [(name, fanned.get(name, func)) for name, func in approaches_to_test]
+
     for approach_name, generator_func in approaches_to_test:
         print(f"\n{'='*80}")
         print(f"TESTING: {approach_name.upper().replace('_', ' ')}")
@@ -643,8 +670,7 @@ def save_results(results_by_approach: Dict[str, List[Dict]], output_path: str):
             'results': results
         }
 
-    with open(output_path, 'w') as f:
-        json.dump(output_data, f, indent=2)
+    dump_pretty(output_data, output_path)
 
     print(f"✅ Detailed results saved to: {output_path}")
 
@@ -661,6 +687,8 @@ def main():
                        help='Which approach(es) to test (default: all)')
     parser.add_argument('--save', help='Save detailed results to JSON file')
     parser.add_argument('--verbose', '-v', action='store_true', help='Verbose output')
+    parser.add_argument('--single-call', action='store_true',
+                        help='Generate all 5 experimental strategies with one call per bullet/JD pair')
 
     args = parser.parse_args()
 
@@ -672,7 +700,7 @@ def main():
     print("  [name]       - Test specific approach (combined, batch, etc.)\n")
 
     # Run evaluation
-    results_by_approach = run_evaluation(args.bullets, args.jobs, args.verbose, args.approach)
+    results_by_approach = run_evaluation(args.bullets, args.jobs, args.verbose, args.approach, args.single_call)
 
     # Print summary
     print_summary(results_by_approach)
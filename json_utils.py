@@ -0,0 +1,48 @@
+"""
+JSON helpers shared by the app and the evaluation scripts.
+
+orjson (in requirements.txt) is used when installed; the stdlib fallback is
+kept in this one place and matches its output: NaN/Infinity are written as
+null and keys are coerced to strings.
+"""
+
+import json, math
+from pathlib import Path
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _finite(value: Any) -> Any:
+    """Replace NaN/Infinity with None, as orjson does (the stdlib would write bare NaN)."""
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {str(k): _finite(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_finite(v) for v in value]
+    return value
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    return orjson.loads(data) if orjson else json.loads(data)
+
+
+def dumps(obj: Any) -> bytes:
+    """Compact JSON as UTF-8 bytes."""
+    if orjson:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(_finite(obj), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def dump_pretty(obj: Any, path: Union[str, Path]) -> None:
+    """Write obj to path indented by 2 spaces (large evaluation result sets)."""
+    if orjson:
+        data = orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    else:
+        data = json.dumps(_finite(obj), indent=2, ensure_ascii=False).encode("utf-8")
+    with open(path, "wb") as f:
+        f.write(data)
@@ -0,0 +1,248 @@
+"""
+Response cache for bullet-generation LLM calls.
+
+A/B tests and iterative resume editing resend the same
+(stored_facts, job_description, original_bullet, char_limit) tuple for the same
+strategy many times. Low-temperature calls are close to deterministic, so the
+result is cached and the Anthropic round trip is skipped on a repeat.
+
+Two layers:
+1. Exact match: sha256 of the canonical JSON payload, kept in memory and
+   (optionally, for evaluation runs) persisted as one JSON file per key under
+   LLM_CACHE_DIR, which has no eviction; the API default is memory only. The
+   payload includes the models, strategy/format toggles and PROMPT_VERSION, so
+   switching any of them (e.g. a fused vs sequential A/B) never reuses entries.
+2. Semantic match (opt-in via USE_SEMANTIC_LLM_CACHE): if the exact key misses,
+   reuse an entry for the same strategy + identical facts/bullet/limit whose
+   job description embedding has cosine >= LLM_CACHE_SIM_THRESHOLD. Entries are
+   indexed by that signature, so a lookup only compares against its own strategy/inputs.
+
+memo_key/memo_get/memo_put expose the exact layer to temperature-0 helpers
+(llm_distill_jd, llm_extract_terms) so their results also survive restarts when
+LLM_CACHE_DIR is set.
+"""
+
+import os, json, hashlib, functools, tempfile, threading
+from typing import Any, Dict, Optional, Tuple, Callable
+import numpy as np
+from config import (LLM_CACHE_DIR, LLM_CACHE_MAX_TEMPERATURE, USE_SEMANTIC_LLM_CACHE,
+                    LLM_CACHE_SIM_THRESHOLD, CHAT_MODEL, GEN_MODEL, CRITIQUE_MODEL,
+                    MULTI_STAGE_STRATEGY, BATCH_OUTPUT_FORMAT, FUSED_THINKING_BUDGET, log)
+
+# Bullets (str) from cached_llm_call, plus whatever JSON value memo_put stores
+_memory: Dict[str, Any] = {}
+_MEMORY_MAX = 4096
+# Semantic layer: signature -> {exact key: normalized JD embedding}, plus exact key -> signature
+# in insertion order for eviction. Both it and the JD embedding memo hold at most _SEMANTIC_MAX.
+_semantic_entries: Dict[str, Dict[str, np.ndarray]] = {}
+_semantic_order: Dict[str, str] = {}
+_jd_embeddings: Dict[str, np.ndarray] = {}
+_SEMANTIC_MAX = 1024
+# The wrapped functions run in asyncio.to_thread workers; guards the dicts above
+_lock = threading.RLock()
+
+stats = {"hits": 0, "semantic_hits": 0, "misses": 0}
+
+# Per-thread "don't store this result" flag, set by dont_cache() during a wrapped call
+_local = threading.local()
+
+# Modules whose source holds the prompt templates; any edit to them changes PROMPT_VERSION
+# and so invalidates entries written by the old prompts (including those on disk).
+_PROMPT_SOURCES = ("llm_utils.py",)
+
+
+def _prompt_version() -> str:
+    h = hashlib.sha256()
+    here = os.path.dirname(os.path.abspath(__file__))
+    for name in _PROMPT_SOURCES:
+        path = os.path.join(here, name)
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                h.update(f.read())
+    return h.hexdigest()[:16]
+
+
+PROMPT_VERSION = _prompt_version()
+
+# Everything besides the call arguments that changes which bullet comes back
+_SETTINGS = {
+    "prompt_version": PROMPT_VERSION,
+    "models": [CHAT_MODEL, GEN_MODEL, CRITIQUE_MODEL],
+    "strategy": MULTI_STAGE_STRATEGY,
+    "batch_format": BATCH_OUTPUT_FORMAT,
+    "thinking_budget": FUSED_THINKING_BUDGET,
+}
+
+
+def _canonical(payload: Dict) -> str:
+    return json.dumps(payload, sort_keys=True, default=str, ensure_ascii=False)
+
+
+def _sha(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _disk_path(key: str) -> Optional[str]:
+    if not LLM_CACHE_DIR: return None
+    return os.path.join(LLM_CACHE_DIR, f"{key}.json")
+
+
+def _read(key: str) -> Optional[Any]:
+    with _lock:
+        if key in _memory: return _memory[key]
+    path = _disk_path(key)
+    if not path or not os.path.exists(path): return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            value = json.load(f)["result"]
+    except Exception as e:
+        log.warning(f"llm_cache: unreadable entry {path}: {e}")
+        return None
+    _remember(key, value)
+    return value
+
+
+def _remember(key: str, value: Any) -> None:
+    with _lock:
+        if key not in _memory and len(_memory) >= _MEMORY_MAX:
+            _memory.pop(next(iter(_memory)))  # evict oldest; disk entries remain
+        _memory[key] = value
+
+
+def _write(key: str, value: Any) -> None:
+    _remember(key, value)
+    path = _disk_path(key)
+    if not path: return
+    try:
+        os.makedirs(LLM_CACHE_DIR, exist_ok=True)
+        with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=LLM_CACHE_DIR, suffix=".tmp", delete=False) as f:
+            json.dump({"result": value}, f, ensure_ascii=False)
+        os.replace(f.name, path)
+    except Exception as e:
+        log.warning(f"llm_cache: failed to persist {path}: {e}")
+
+
+def _jd_vector(job_description: str) -> Optional[np.ndarray]:
+    h = _sha(job_description)
+    with _lock:
+        if h in _jd_embeddings: return _jd_embeddings[h]
+    from llm_utils import embed  # late import: llm_utils imports this module
+    vec = np.asarray(embed(job_description), dtype=np.float32)
+    norm = float(np.linalg.norm(vec)) if vec.size else 0.0
+    if norm == 0.0: return None
+    vec = vec / norm
+    with _lock:
+        if h not in _jd_embeddings and len(_jd_embeddings) >= _SEMANTIC_MAX:
+            _jd_embeddings.pop(next(iter(_jd_embeddings)))  # evict oldest
+        _jd_embeddings[h] = vec
+    return vec
+
+
+def _semantic_lookup(signature: str, job_description: str) -> Tuple[Optional[str], Optional[np.ndarray]]:
+    vec = _jd_vector(job_description)
+    if vec is None: return None, None
+    with _lock:
+        candidates = list(_semantic_entries.get(signature, {}).items())
+    if not candidates: return None, vec
+    sims = np.stack([other for _, other in candidates]) @ vec
+    for i in np.argsort(-sims):
+        if sims[i] < LLM_CACHE_SIM_THRESHOLD: break
+        value = _read(candidates[i][0])
+        if value is not None: return value, vec
+    return None, vec
+
+
+def _semantic_add(signature: str, vec: np.ndarray, key: str) -> None:
+    with _lock:
+        if key not in _semantic_order and len(_semantic_order) >= _SEMANTIC_MAX:
+            old_key = next(iter(_semantic_order))
+            old_sig = _semantic_order.pop(old_key)  # evict oldest
+            bucket = _semantic_entries.get(old_sig, {})
+            bucket.pop(old_key, None)
+            if not bucket: _semantic_entries.pop(old_sig, None)
+        _semantic_order[key] = signature
+        _semantic_entries.setdefault(signature, {})[key] = vec
+
+
+def hit_rate() -> float:
+    total = stats["hits"] + stats["semantic_hits"] + stats["misses"]
+    return (stats["hits"] + stats["semantic_hits"]) / total if total else 0.0
+
+
+def dont_cache() -> None:
+    """
+    Keep the result of the current cached_llm_call from being stored.
+
+    For calls that degraded (unparseable response) or that sampled at a
+    temperature above the one the decorator was declared with.
+    """
+    _local.skip = True
+
+
+def cached_llm_call(temperature: float) -> Callable:
+    """
+    Decorate a generate_bullet_* function with the response cache.
+
+    `temperature` is the sampling temperature of the call that produces the
+    returned bullet; strategies above LLM_CACHE_MAX_TEMPERATURE are returned
+    unwrapped since their output is intentionally varied.
+    """
+    def decorator(fn: Callable) -> Callable:
+        if temperature > LLM_CACHE_MAX_TEMPERATURE:
+            return fn
+
+        @functools.wraps(fn)
+        def wrapper(original_bullet: str, job_description: str,
+                    stored_facts: Dict, char_limit: Optional[int] = None) -> str:
+            rest = {"fn": fn.__name__, "facts": stored_facts or {},
+                    "orig": original_bullet, "char": char_limit, "settings": _SETTINGS}
+            key = _sha(_canonical({**rest, "jd": job_description}))
+
+            cached = _read(key)
+            if cached is not None:
+                stats["hits"] += 1
+                log.info(f"llm_cache hit fn={fn.__name__} hit_rate={hit_rate():.2f}")
+                return cached
+
+            signature = _sha(_canonical(rest))
+            vec = None
+            if USE_SEMANTIC_LLM_CACHE:
+                try:
+                    cached, vec = _semantic_lookup(signature, job_description)
+                except Exception as e:
+                    log.warning(f"llm_cache: semantic lookup failed: {e}")
+                if cached is not None:
+                    stats["semantic_hits"] += 1
+                    log.info(f"llm_cache semantic hit fn={fn.__name__} hit_rate={hit_rate():.2f}")
+                    return cached
+
+            stats["misses"] += 1
+            _local.skip = False
+            result = fn(original_bullet, job_description, stored_facts, char_limit)
+            if _local.skip:
+                log.info(f"llm_cache skip fn={fn.__name__}")
+                return result
+            _write(key, result)
+            if vec is not None:
+                _semantic_add(signature, vec, key)
+            log.info(f"llm_cache miss fn={fn.__name__} hit_rate={hit_rate():.2f}")
+            return result
+
+        return wrapper
+    return decorator
+
+
+def memo_key(fn_name: str, **payload) -> str:
+    """
+    Exact-match key for deterministic (temperature 0) helper calls, e.g. JD distillation.
+    Includes PROMPT_VERSION, so editing the helper's prompt invalidates its entries.
+    """
+    return _sha(_canonical({"fn": fn_name, "prompt_version": PROMPT_VERSION, **payload}))
+
+
+def memo_get(key: str) -> Optional[Any]:
+    return _read(key)
+
+
+def memo_put(key: str, value: Any) -> None:
+    _write(key, value)
@@ -1,19 +1,36 @@
-import re, hashlib, json
-from json import loads
+import os, re, copy, hashlib, json, functools, tempfile, threading
+from array import array
+import numpy as np
 from typing import List, Dict, Optional, Tuple
-from config import client, async_client, openai_client, CHAT_MODEL, EMBED_MODEL, USE_DISTILLED_JD, USE_LLM_TERMS, log
+from config import (client, async_client, openai_client, CHAT_MODEL, GEN_MODEL, CRITIQUE_MODEL, EMBED_MODEL,
+                    USE_DISTILLED_JD, USE_LLM_TERMS, MULTI_STAGE_STRATEGY, FUSED_THINKING_BUDGET, BATCH_OUTPUT_FORMAT,
+                    REPROMPT_TRIES, EMBED_CACHE_DIR, PROMPT_CACHE_MIN_TOKENS, log)
 from text_utils import top_terms
-
-_distill_cache: Dict[str, str] = {}
-_terms_cache: Dict[str, Dict[str, List[str]]] = {}
+from json_utils import loads
+from llm_cache import cached_llm_call, dont_cache, memo_key, memo_get, memo_put
+
+_JSON_FENCE_RE = re.compile(r"^\s*json", re.I)
+_NUMBERED_RE = re.compile(r"^\s*\d+[.)]\s*")
+_PREFIX_RE = re.compile(r"^(VERSION\s*\d+|Winner|Best|FINAL)\s*:\s*", re.I)
+_SCORE_RE = re.compile(r"(\d{1,3})")
+_DIGIT_RE = re.compile(r"\d")
+_NUMBER_RE = re.compile(r"\d+(?:[.,]\d+)*")
+_METRIC_RE = re.compile(r"\d+[%$KMB]|\d+\+|\d{1,3}(,\d{3})*")
+_SCOPE_RE = re.compile(r"\d+\s*(person|people|member|month|year|week|K|M|B|\$)", re.I)
+
+_embed_cache: Dict[str, array] = {}  # float32 storage: 4 bytes/dim instead of a boxed Python float
+_EMBED_CACHE_MAX = 4096
+_embed_lock = threading.Lock()  # embed() runs in asyncio.to_thread workers; reads reorder the LRU too
+_EMBED_BATCH_MAX = 2048  # inputs per embeddings request accepted by the API
 
 def jd_hash(jd_text: str) -> str:
     return hashlib.sha256(jd_text.encode("utf-8")).hexdigest()
 
 def llm_distill_jd(jd_text: str) -> str:
     if not client or not jd_text.strip(): return jd_text
-    h = jd_hash(jd_text)
-    if h in _distill_cache: return _distill_cache[h]
+    key = memo_key("llm_distill_jd", jd=jd_text, model=CHAT_MODEL)
+    cached = memo_get(key)
+    if cached is not None: return cached
     prompt = f"""Distill the JOB DESCRIPTION into a focused role core (8–12 bullet-like lines), excluding perks, benefits, compensation, culture, location, legal/EEO, boilerplate.
 Include only: core responsibilities, required skills/tools, domain focus, seniority/scope.
 Return plain text only.
@@ -24,15 +41,16 @@ JOB DESCRIPTION:
     r = client.messages.create(model=CHAT_MODEL, max_tokens=1024, messages=[{"role":"user","content":prompt}], temperature=0)
     distilled = (r.content[0].text or "").strip()
     if not distilled or len(distilled) < 40: distilled = jd_text
-    _distill_cache[h] = distilled
+    memo_put(key, distilled)
     log.info(f"The distilled job description is {distilled}")
     return distilled
 
 def llm_extract_terms(jd_text: str) -> Dict[str, List[str]]:
     if not client or not jd_text.strip():
         return {"skills": [], "tools": [], "domains": [], "responsibilities": [], "seniority": [], "certifications": []}
-    h = "terms:" + jd_hash(jd_text)
-    if h in _terms_cache: return _terms_cache[h]
+    key = memo_key("llm_extract_terms", jd=jd_text, model=CHAT_MODEL)
+    cached = memo_get(key)
+    if cached is not None: return cached
     prompt = f"""Extract role-critical keywords from the JOB DESCRIPTION as strict JSON.
 Exclude benefits, perks, location, compensation, culture, legal, EEO, boilerplate.
 Groups:
@@ -56,20 +74,80 @@ JOB DESCRIPTION:
         cleaned = raw.strip()
         if cleaned.startswith("```"):
             cleaned = cleaned.strip("`")
-            cleaned = re.sub(r"^\s*json", "", cleaned, flags=re.I).strip()
+            cleaned = _JSON_FENCE_RE.sub("", cleaned).strip()
         data = loads(cleaned)
     out = {k: sorted(set([t.strip() for t in data.get(k, []) if isinstance(t, str) and t.strip()])) for k in
            ["skills","tools","domains","responsibilities","seniority","certifications"]}
-    _terms_cache[h] = out
+    memo_put(key, out)
     log.info(f"The key terms for this job are {out}")
 
 
     return out
 
+def _embed_key(text: str) -> str:
+    # Whitespace-insensitive key: re-pasted JDs/resumes that differ only in line breaks or spacing share one entry
+    return jd_hash(" ".join(text.split()))
+
+def _embed_path(h: str) -> Optional[str]:
+    # Namespaced by model so switching EMBED_MODEL never serves vectors from another embedding space
+    if not EMBED_CACHE_DIR: return None
+    return os.path.join(EMBED_CACHE_DIR, EMBED_MODEL, f"{h}.f32")
+
+def _cached_embedding(h: str) -> Optional[array]:
+    """Memory first, then the on-disk copy from a previous process."""
+    with _embed_lock:
+        vec = _embed_cache.pop(h, None)
+        if vec is not None:
+            _embed_cache[h] = vec  # re-insert as most recent, so eviction is least-recently-used
+            return vec
+    path = _embed_path(h)
+    if not path or not os.path.exists(path): return None
+    try:
+        vec = array("f")
+        with open(path, "rb") as f:
+            vec.frombytes(f.read())
+    except Exception as e:
+        log.warning(f"embed cache: unreadable entry {path}: {e}")
+        return None
+    return _cache_embedding(h, vec, persist=False)
+
+def _cache_embedding(h: str, vec, persist: bool = True) -> array:
+    packed = vec if isinstance(vec, array) else array("f", vec)
+    with _embed_lock:
+        if h not in _embed_cache and len(_embed_cache) >= _EMBED_CACHE_MAX:
+            _embed_cache.pop(next(iter(_embed_cache)))  # evict least recently used
+        _embed_cache[h] = packed
+    path = _embed_path(h) if persist else None
+    if path:
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Unique temp name: two threads embedding the same text must not share one file
+            with tempfile.NamedTemporaryFile(dir=os.path.dirname(path), suffix=".tmp", delete=False) as f:
+                f.write(packed.tobytes())
+            os.replace(f.name, path)
+        except Exception as e:
+            log.warning(f"embed cache: failed to persist {path}: {e}")
+    return packed
+
 def embed(text: str) -> List[float]:
-    if not openai_client: return []
-    resp = openai_client.embeddings.create(model=EMBED_MODEL, input=text)
-    return resp.data[0].embedding
+    return embed_many([text])[0].tolist()
+
+def embed_many(texts: List[str]) -> List[array]:
+    """
+    Embed several texts in one request; cached texts are served from _embed_cache and skipped.
+    Returns float32 arrays (np.asarray wraps them without a copy).
+    """
+    if not openai_client: return [array("f") for _ in texts]
+    hashes = [_embed_key(t) for t in texts]
+    found = {h: _cached_embedding(h) for h in dict.fromkeys(hashes)}
+    missing = {h: t for h, t in zip(hashes, texts) if found[h] is None}
+    # ceil(N / _EMBED_BATCH_MAX) round trips, i.e. one for anything a resume or bullet bank produces
+    pending = list(missing.items())
+    for i in range(0, len(pending), _EMBED_BATCH_MAX):
+        chunk = pending[i:i + _EMBED_BATCH_MAX]
+        resp = openai_client.embeddings.create(model=EMBED_MODEL, input=[t for _, t in chunk])
+        found.update((h, _cache_embedding(h, d.embedding)) for (h, _), d in zip(chunk, resp.data))
+    return [found[h] for h in hashes]
 
 def llm_fit_score(resume_text: str, jd_text: str) -> float:
     if not client: return 0.0
@@ -85,7 +163,7 @@ RESUME:
 """
     r = client.messages.create(model=CHAT_MODEL, max_tokens=64, messages=[{"role":"user","content":prompt}], temperature=0)
     out = (r.content[0].text or "").strip()
-    m = re.search(r"(\d{1,3})", out)
+    m = _SCORE_RE.search(out)
     if not m: return 0.0
     val = max(0, min(100, int(m.group(1))))
     return float(val)
@@ -228,7 +306,7 @@ Evaluate objectively and independently. Each dimension should be scored 1-10."""
         # Clean potential code fences
         if raw.startswith("```"):
             raw = raw.strip("`")
-            raw = re.sub(r"^\s*json", "", raw, flags=re.I).strip()
+            raw = _JSON_FENCE_RE.sub("", raw).strip()
 
         scores = loads(raw)
 
@@ -358,6 +436,282 @@ Format: YES|reason or NO|reason"""
         return True, reason
 
 
+# Static instruction blocks shared by the generate/critique/revise/batch prompts.
+_XYZ_RULES = """FORMAT: Use Google's XYZ structure (vary your phrasing, not literal every time):
+- X = What you accomplished/delivered
+- Y = Measurable result/impact (only if in source!)
+- Z = How you did it (methods, tools, approach)
+Good examples: "Reduced costs 20% by automating...", "Led team of 8 to deliver...", "Built pipeline processing 1M records using..."
+"""
+
+_TOOLS_RULES = """TOOLS: Only mention tools that are:
+- Technical differentiators (Python, Tableau, Snowflake, etc.)
+- Explicitly mentioned in the JD
+- Essential to understanding the achievement
+OMIT basic tools: Excel, pivot tables, Word, PowerPoint, email, "various tools"
+"""
+
+_CONCISENESS_RULES = """CONCISENESS: Cut filler ruthlessly.
+- Use tool names directly: "SQL" not "SQL-based data extraction"
+- Cut meaningless phrases: "data-driven strategies", "leveraging insights", "utilizing methodologies"
+- Every word must earn its place - if removing it doesn't lose meaning, remove it
+"""
+
+_CRITIQUE_CHECKS = """Check:
+1. Does the bullet contain ANY information not in the source? (This is a failure)
+2. Does it follow XYZ structure (accomplishment + result + method)? Phrasing can vary.
+3. Is it relevant to the job?
+4. Is it concise? Flag verbose filler like:
+   - "SQL-based data extraction" (should be "SQL")
+   - "data-driven strategies", "leveraging insights", "utilizing methodologies"
+   - Any phrase that can be cut without losing meaning
+
+List specific issues. If it added information not in source, that's the #1 problem."""
+
+_REVISE_RULES = """FORMAT: Use Google's XYZ structure (vary your phrasing):
+- X = What you accomplished/delivered
+- Y = Measurable result/impact (only if in source!)
+- Z = How you did it
+
+⚠️ If critique says you added information, REMOVE IT. Only use source material.
+A modest honest bullet beats an impressive lie."""
+
+_BATCH_RULES = """⚠️ CRITICAL CONSTRAINTS:
+- For each bullet, use ONLY the facts provided (or original if no facts)
+- Do NOT add metrics, tools, or details not in the source
+- If a bullet doesn't fit the job well, write the best honest version
+
+BATCH OPTIMIZATION GOALS:
+1. Vary sentence structures and XYZ phrasing across bullets (don't start all with same pattern)
+2. Distribute JD keywords strategically (don't repeat same keywords in every bullet)
+3. Lead with strongest/most relevant bullets' content
+4. Ensure each bullet stands alone but together tells a cohesive story"""
+
+_HIRING_SYSTEM = """You're an experienced hiring manager who VALUES HONESTY over impressiveness.
+
+You know:
+- A candidate who embellishes is a red flag
+- Modest but verifiable beats impressive but vague
+- You'd rather see "Analyzed data" than "Leveraged advanced analytics to drive strategic insights"
+- Specifics from the actual work matter more than buzzwords"""
+
+
+# Full prompt templates (str.format). All static text comes before the per-call
+# fields so consecutive calls share the longest possible byte-identical prefix;
+# the job description precedes the per-bullet source since it is shared across a resume.
+_GEN_TEMPLATE = ("You are a resume writer who NEVER invents information.\n\n"
+                 + _XYZ_RULES + "\n" + _TOOLS_RULES + "\n" + _CONCISENESS_RULES + """
+⚠️ CONSTRAINT: Use ONLY information from the source below. Add nothing.
+If fit is poor, that's OK - write the best honest bullet you can.
+Return ONLY the bullet.
+
+JOB DESCRIPTION:
+{job_description}
+
+{source}
+{char_text}""")
+
+_CRITIQUE_TEMPLATE = ("Review the bullet below for FACTUAL ACCURACY first, then quality.\n\n"
+                      + _CRITIQUE_CHECKS + """
+
+SOURCE MATERIAL:
+{source}
+
+BULLET TO REVIEW:
+{draft}""")
+
+_REVISE_TEMPLATE = ("Revise the bullet below based on the critique.\n\n"
+                    + _REVISE_RULES + """
+Return ONLY the revised bullet.
+
+SOURCE (your ONLY allowed information):
+{source}
+
+BULLET: {draft}
+CRITIQUE: {critique}
+{char_text}""")
+
+_BULLET_SEP = "<<<BULLET>>>"
+_BATCH_OUTPUT_RULE = (
+    f"Return the optimized bullets separated by the token {_BULLET_SEP}, one per input bullet, in the same order, with no numbering."
+    if BATCH_OUTPUT_FORMAT == "delimiter" else
+    "Submit the optimized bullets with submit_bullets, one per input bullet, in the same order."
+)
+_BATCH_TEMPLATE = ("You are a resume writer optimizing a SET of bullets together. NEVER invent information.\n\n"
+                   + _XYZ_RULES + "\n" + _BATCH_RULES + "\n\n" + _BATCH_OUTPUT_RULE + """
+
+JOB DESCRIPTION:
+{job_description}
+
+BULLETS TO OPTIMIZE ({count}):
+{bullets_section}
+{char_text}""")
+
+_HIRING_TEMPLATE = """FORMAT: Use XYZ structure (vary phrasing naturally):
+- What they accomplished + measurable result (if available) + how they did it
+- Examples: "Reduced costs 20% by automating...", "Led team of 8 to deliver...", "Built pipeline processing 1M records using..."
+
+Rewrite the candidate's experience below as a bullet I'd trust. Use ONLY the candidate's information - add nothing.
+If their experience doesn't match my job well, that's fine - I prefer an honest modest bullet over an impressive fake one.
+Return ONLY the bullet.
+
+I'm hiring for:
+{job_description}
+
+Candidate's VERIFIED information (this is ALL you can use):
+{source}
+{char_text}"""
+
+
+_FACT_CATEGORIES = ("tools", "skills", "actions", "results", "situation", "timeline")
+
+
+def _has_any_facts(stored_facts: Optional[Dict]) -> bool:
+    """True if any of the known fact categories is non-empty."""
+    return bool(stored_facts and any(stored_facts.get(c) for c in _FACT_CATEGORIES))
+
+
+def _should_skip_llm(original_bullet: str, stored_facts: Optional[Dict]) -> bool:
+    """True when there is nothing to rework: no facts and a short bullet with no numbers."""
+    if _has_any_facts(stored_facts):
+        return False
+    words = len(original_bullet.split())
+    if words >= 8 or _DIGIT_RE.search(original_bullet):
+        return False
+    log.info(f"skip_reason=trivial_source words={words} - returning original '{original_bullet[:50]}'")
+    return True
+
+
+_SENTENCE_END_RE = re.compile(r"[.!?](?=\s|$)")
+
+
+_WS_RE = re.compile(r"\s+")
+_HSPACE_RE = re.compile(r"[^\S\n]+")
+_BLANK_LINES_RE = re.compile(r"\n{3,}")
+
+
+@functools.lru_cache(maxsize=64)
+def _canon_jd(job_description: str) -> str:
+    """
+    One canonical form per JD so the prompt-cache prefix matches: runs of spaces/tabs
+    collapsed, trailing whitespace and extra blank lines dropped. Line breaks are kept.
+    """
+    text = (job_description or "").replace("\r\n", "\n")
+    text = "\n".join(_HSPACE_RE.sub(" ", line).rstrip() for line in text.split("\n"))
+    return _BLANK_LINES_RE.sub("\n\n", text).strip()
+
+
+def _cacheable(prefix: str) -> bool:
+    """Whether a prompt prefix is long enough (~3.5 chars/token) for a cache_control breakpoint to take effect."""
+    return len(prefix) / 3.5 >= PROMPT_CACHE_MIN_TOKENS
+
+
+def _user_content(prompt: str, job_description: Optional[str] = None):
+    """
+    User message content with prompt-cache breakpoints: the instructions before the JD
+    and the JD itself are separate cache_control blocks, so a new JD only misses its
+    own block. A breakpoint is only set once the prefix up to it reaches
+    PROMPT_CACHE_MIN_TOKENS; below that the API would not cache it anyway. Falls back
+    to the plain string when the JD is not in the prompt or no prefix is long enough.
+    """
+    i = prompt.find(job_description) if job_description else -1
+    j = i + len(job_description) if i > 0 else -1
+    if i <= 0 or not _cacheable(prompt[:j]):
+        return prompt
+    blocks = [{"type": "text", "text": prompt[:i]}, {"type": "text", "text": prompt[i:j]}]
+    for block, end in zip(blocks, (i, j)):
+        if _cacheable(prompt[:end]):
+            block["cache_control"] = {"type": "ephemeral"}
+    if prompt[j:].strip():
+        blocks.append({"type": "text", "text": prompt[j:]})
+    return blocks
+
+
+def _max_tok_for_chars(char_limit: Optional[int], fudge: float = 1.6) -> int:
+    """Output token budget for one bullet: ~3.5 chars/token with headroom (360 chars if unknown)."""
+    return int((char_limit or 360) / 3.5 * fudge) + 16
+
+
+def _generate_bullet_text(prompt: str, model: str, temperature: float, char_limit: Optional[int],
+                          max_tokens: int = 1024, system: Optional[str] = None,
+                          job_description: Optional[str] = None) -> str:
+    """
+    Generate a single bullet, streaming with early stop when char_limit is known.
+
+    With a char_limit the output budget is tightened via _max_tok_for_chars. The
+    stream is closed early only when the result is already complete: the model
+    finished a paragraph (a preamble ending in ":" is skipped), or the text ran
+    30% past the limit and a sentence ends between half the limit and the limit.
+    Otherwise the stream runs to the end and the full text is returned, so the
+    caller's cap/reprompt shortens a complete bullet rather than a fragment.
+    Without a char_limit this is a plain messages.create.
+    """
+    kwargs = {"model": model, "messages": [{"role": "user", "content": _user_content(prompt, job_description)}],
+              "temperature": temperature}
+    if system:
+        kwargs["system"] = system
+
+    if not char_limit:
+        r = client.messages.create(max_tokens=max_tokens, **kwargs)
+        return (r.content[0].text or "").strip()
+
+    buf = ""
+    para_start = 0  # offset in buf of the paragraph being written
+    length_checked = False
+    with client.messages.stream(max_tokens=_max_tok_for_chars(char_limit), **kwargs) as stream:
+        for delta in stream.text_stream:
+            scan_from = max(para_start, len(buf) - 1)  # a "\n\n" may straddle two deltas
+            buf += delta
+            brk = buf.find("\n\n", scan_from)
+            while brk != -1:
+                para = buf[para_start:brk].strip()
+                if para and not para.endswith(":"):
+                    log.info(f"  Stream stopped at paragraph end ({len(para)} chars, limit {char_limit})")
+                    return para
+                para_start = brk + 2
+                brk = buf.find("\n\n", para_start)
+            if not length_checked and len(buf) - para_start > char_limit * 1.3:
+                length_checked = True
+                para = buf[para_start:].lstrip()
+                ends = [m.end() for m in _SENTENCE_END_RE.finditer(para)
+                        if char_limit * 0.5 <= m.end() <= char_limit]
+                if ends:
+                    log.info(f"  Stream stopped at sentence end {ends[-1]} (limit {char_limit})")
+                    return para[:ends[-1]].strip()
+
+    paragraphs = [p.strip() for p in buf.split("\n\n") if p.strip()]
+    return paragraphs[-1] if paragraphs else ""
+
+
+def _format_facts_detailed(stored_facts: Dict) -> str:
+    """Multi-line facts block (bulleted actions/results) used by the with-facts and metrics prompts."""
+    parts = []
+    if stored_facts.get("situation"):
+        parts.append(f"Situation/Context: {stored_facts['situation']}\n")
+
+    actions = stored_facts.get("actions")
+    if isinstance(actions, list) and actions:
+        parts.append("Actions Taken:\n")
+        parts.extend(f"• {item}\n" for item in actions)
+
+    results = stored_facts.get("results")
+    if isinstance(results, list) and results:
+        parts.append("Results/Achievements:\n")
+        parts.extend(f"• {item}\n" for item in results)
+
+    skills = stored_facts.get("skills")
+    if isinstance(skills, list) and skills:
+        parts.append(f"Skills: {', '.join(skills)}\n")
+
+    tools = stored_facts.get("tools")
+    if isinstance(tools, list) and tools:
+        parts.append(f"Tools/Technologies: {', '.join(tools)}\n")
+
+    if stored_facts.get("timeline"):
+        parts.append(f"Timeline: {stored_facts['timeline']}\n")
+    return "".join(parts)
+
+
 def _generate_bullet_without_facts(original_bullet: str, job_description: str,
                                    char_limit: Optional[int] = None) -> str:
     """
@@ -417,13 +771,13 @@ Return ONLY the reworded bullet. No explanation."""
 
     try:
         log.debug(f"  Calling Anthropic with temperature=0.2")
-        response = client.messages.create(
-            model=CHAT_MODEL,
-            max_tokens=1024,
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.2  # Low temperature to reduce creativity/hallucination
+        enhanced = _generate_bullet_text(
+            prompt,
+            CHAT_MODEL,
+            temperature=0.2,  # Low temperature to reduce creativity/hallucination
+            char_limit=char_limit,
+            job_description=job_description
         )
-        enhanced = response.content[0].text.strip()
 
         log.info(f"  LLM returned: '{enhanced[:100]}...'")
         log.debug(f"  Full LLM response: '{enhanced}'")
@@ -451,6 +805,7 @@ Return ONLY the reworded bullet. No explanation."""
         return original_bullet
 
 
+@cached_llm_call(temperature=0.2)
 def generate_bullet_with_facts(original_bullet: str, job_description: str,
                                stored_facts: Dict, char_limit: Optional[int] = None) -> str:
     """
@@ -471,15 +826,15 @@ def generate_bullet_with_facts(original_bullet: str, job_description: str,
     Returns:
         Enhanced bullet string
     """
+    if _should_skip_llm(original_bullet, stored_facts):
+        return original_bullet
+
     if not client:
         raise RuntimeError("ANTHROPIC_API_KEY missing")
+    job_description = _canon_jd(job_description)
 
     # Detect if we have meaningful facts
-    has_meaningful_facts = bool(
-        stored_facts and
-        any(stored_facts.get(category) for category in
-            ["tools", "skills", "actions", "results", "situation", "timeline"])
-    )
+    has_meaningful_facts = _has_any_facts(stored_facts)
 
     # Detailed logging for path detection
     log.info(f"generate_bullet_with_facts - Bullet: '{original_bullet[:60]}...'")
@@ -501,38 +856,7 @@ def generate_bullet_with_facts(original_bullet: str, job_description: str,
 
     # PATH 2: With facts - use existing fact-based generation
     # Build facts context from stored facts
-    facts_text = ""
-
-    # Format facts using the current schema (situation, actions, results, skills, tools, timeline)
-    if stored_facts.get("situation"):
-        facts_text += f"Situation/Context: {stored_facts['situation']}\n"
-
-    if stored_facts.get("actions"):
-        actions = stored_facts["actions"]
-        if isinstance(actions, list) and actions:
-            facts_text += "Actions Taken:\n"
-            for item in actions:
-                facts_text += f"• {item}\n"
-
-    if stored_facts.get("results"):
-        results = stored_facts["results"]
-        if isinstance(results, list) and results:
-            facts_text += "Results/Achievements:\n"
-            for item in results:
-                facts_text += f"• {item}\n"
-
-    if stored_facts.get("skills"):
-        skills = stored_facts["skills"]
-        if isinstance(skills, list) and skills:
-            facts_text += f"Skills: {', '.join(skills)}\n"
-
-    if stored_facts.get("tools"):
-        tools = stored_facts["tools"]
-        if isinstance(tools, list) and tools:
-            facts_text += f"Tools/Technologies: {', '.join(tools)}\n"
-
-    if stored_facts.get("timeline"):
-        facts_text += f"Timeline: {stored_facts['timeline']}\n"
+    facts_text = _format_facts_detailed(stored_facts)
 
     char_limit_text = f"\nIMPORTANT: Keep the bullet under {char_limit} characters." if char_limit else ""
 
@@ -571,15 +895,14 @@ Return ONLY the bullet. No explanation."""
     log.info(f"  ===== WITH-FACTS PROMPT END =====")
 
     log.debug(f"  Calling Anthropic with temperature=0.2")
-    r = client.messages.create(
-        model=CHAT_MODEL,
-        max_tokens=1024,
-        messages=[{"role": "user", "content": prompt}],
-        temperature=0.2  # Low to reduce hallucination
+    enhanced_bullet = _generate_bullet_text(
+        prompt,
+        CHAT_MODEL,
+        temperature=0.2,  # Low to reduce hallucination
+        char_limit=char_limit,
+        job_description=job_description
     )
 
-    enhanced_bullet = (r.content[0].text or "").strip()
-
     # Clean up any bullet markers or extra formatting
     enhanced_bullet = enhanced_bullet.lstrip("-• ").strip()
 
@@ -590,6 +913,7 @@ Return ONLY the bullet. No explanation."""
     return enhanced_bullet
 
 
+@cached_llm_call(temperature=0.2)
 def generate_bullet_with_facts_scaffolded(original_bullet: str, job_description: str,
                                          stored_facts: Dict, char_limit: Optional[int] = None) -> str:
     """
@@ -608,15 +932,15 @@ def generate_bullet_with_facts_scaffolded(original_bullet: str, job_description:
     Returns:
         Enhanced bullet string
     """
+    if _should_skip_llm(original_bullet, stored_facts):
+        return original_bullet
+
     if not client:
         raise RuntimeError("ANTHROPIC_API_KEY missing")
+    job_description = _canon_jd(job_description)
 
     # Detect if we have meaningful facts
-    has_meaningful_facts = bool(
-        stored_facts and
-        any(stored_facts.get(category) for category in
-            ["tools", "skills", "actions", "results", "situation", "timeline"])
-    )
+    has_meaningful_facts = _has_any_facts(stored_facts)
 
     log.info(f"generate_bullet_with_facts_SCAFFOLDED - Bullet: '{original_bullet[:60]}...'")
     log.info(f"  has_meaningful_facts: {has_meaningful_facts}")
@@ -698,10 +1022,10 @@ Return ONLY valid JSON (no commentary):
     # Clean code fences if present
     if selection_raw.startswith("```"):
         selection_raw = selection_raw.strip("`")
-        selection_raw = re.sub(r"^\s*json", "", selection_raw, flags=re.I).strip()
+        selection_raw = _JSON_FENCE_RE.sub("", selection_raw).strip()
 
     try:
-        selection_data = json.loads(selection_raw)
+        selection_data = loads(selection_raw)
         selected_facts = selection_data.get("selected_facts", [])
         reasoning = selection_data.get("reasoning", "")
 
@@ -745,14 +1069,13 @@ Return ONLY the bullet."""
 
     log.debug(f"  Crafting prompt created, calling Anthropic")
 
-    r2 = client.messages.create(
-        model=CHAT_MODEL,
-        max_tokens=1024,
-        messages=[{"role": "user", "content": crafting_prompt}],
-        temperature=0.2  # Low to reduce hallucination
+    enhanced_bullet = _generate_bullet_text(
+        crafting_prompt,
+        CHAT_MODEL,
+        temperature=0.2,  # Low to reduce hallucination
+        char_limit=char_limit,
+        job_description=job_description
     )
-
-    enhanced_bullet = (r2.content[0].text or "").strip()
     enhanced_bullet = enhanced_bullet.lstrip("-• ").strip()
 
     log.info(f"  → Scaffolded result: '{enhanced_bullet[:80]}...'")
@@ -812,6 +1135,49 @@ Tell me the story - what did this role actually involve? What were you doing day
     return question
 
 
+FACTS_TOOL = {
+    "name": "record_facts",
+    "description": "Record the structured facts extracted from the conversation.",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "situation": {"type": "string"},
+            "actions": {"type": "array", "items": {"type": "string"}},
+            "results": {"type": "array", "items": {"type": "string"}},
+            "skills": {"type": "array", "items": {"type": "string"}},
+            "tools": {"type": "array", "items": {"type": "string"}},
+            "timeline": {"type": "string"},
+        },
+        "required": ["situation", "actions", "results", "skills", "tools", "timeline"],
+    },
+}
+
+
+# Extracted facts by memo_key. In memory only: conversations are user-provided
+# work history, so they are never written to LLM_CACHE_DIR.
+_facts_cache: Dict[str, Dict] = {}
+_FACTS_CACHE_MAX = 1024
+
+# Default for every FACTS_TOOL field; the type of each default is the type the field is coerced to
+_FACT_DEFAULTS = {"situation": "", "actions": [], "results": [], "skills": [], "tools": [], "timeline": ""}
+
+
+def _coerce_facts(raw: Dict) -> Dict:
+    """Merge extracted facts over _FACT_DEFAULTS, coercing list/str fields (the tool schema is not enforced)."""
+    facts = dict(raw)
+    for key, default in _FACT_DEFAULTS.items():
+        value = facts.get(key)
+        if isinstance(default, list):
+            if isinstance(value, str):
+                value = [value]
+            facts[key] = [str(v) for v in value if str(v).strip()] if isinstance(value, (list, tuple)) else []
+        elif isinstance(value, (list, tuple)):
+            facts[key] = "; ".join(str(v) for v in value if str(v).strip())
+        else:
+            facts[key] = "" if value is None else str(value)
+    return facts
+
+
 def extract_facts_from_conversation(bullet_text: str, conversation_history: str) -> Dict:
     """
     Extract structured facts from a conversational exchange about a work experience.
@@ -837,17 +1203,8 @@ Extract the following information:
 - Skills: Technical and soft skills demonstrated
 - Timeline: When this occurred (if mentioned)
 
-Be specific and preserve numbers. If something wasn't mentioned, omit it rather than guessing.
-
-Output as JSON:
-{
-  "situation": "string describing scope/context",
-  "actions": ["action 1", "action 2"],
-  "results": ["result 1 with metrics", "result 2"],
-  "skills": ["skill 1", "skill 2"],
-  "tools": ["tool 1", "tool 2"],
-  "timeline": "when this happened"
-}"""
+Be specific and preserve numbers. If something wasn't mentioned, leave it empty rather than guessing.
+Record the facts with record_facts."""
 
     user_prompt = f"""Original bullet: "{bullet_text}"
 
@@ -856,193 +1213,255 @@ Conversation:
 
 Extract structured facts from this conversation."""
 
-    r = client.messages.create(
-        model=CHAT_MODEL,
-        max_tokens=1024,
-        system=system_prompt,
-        messages=[
-            {"role": "user", "content": user_prompt}
-        ],
-        temperature=0
-    )
-
-    raw = (r.content[0].text or "").strip()
-
-    try:
-        # Clean potential code fences
-        if raw.startswith("```"):
-            raw = raw.strip("`")
-            raw = re.sub(r"^\s*json", "", raw, flags=re.I).strip()
-
-        facts = loads(raw)
-
-        # Ensure all expected keys exist
-        default_structure = {
-            "situation": "",
-            "actions": [],
-            "results": [],
-            "skills": [],
-            "tools": [],
-            "timeline": ""
-        }
+    # Deterministic (temperature 0, forced tool) -> replaying the same conversation reuses the facts.
+    # The prompt and schema are part of the key, so editing either invalidates old entries.
+    key = memo_key("extract_facts_from_conversation", bullet=bullet_text, conversation=conversation_history,
+                   model=CRITIQUE_MODEL, system=system_prompt, schema=FACTS_TOOL)
+    cached = _facts_cache.get(key)
+    if cached is not None:
+        return copy.deepcopy(cached)
 
-        for key, default_value in default_structure.items():
-            if key not in facts:
-                facts[key] = default_value
+    for attempt in range(REPROMPT_TRIES):
+        r = client.messages.create(
+            model=CRITIQUE_MODEL,  # Structured extraction runs on the fast model
+            max_tokens=1024,
+            system=system_prompt,
+            tools=[FACTS_TOOL],
+            tool_choice={"type": "tool", "name": FACTS_TOOL["name"]},
+            messages=[
+                {"role": "user", "content": user_prompt}
+            ],
+            temperature=0
+        )
+        block = next((b for b in r.content if getattr(b, "type", "") == "tool_use"), None)
+        if block:
+            log.info(f"Extracted facts from conversation for: {bullet_text[:50]}...")
+            facts = _coerce_facts(block.input)
+            if len(_facts_cache) >= _FACTS_CACHE_MAX:
+                _facts_cache.pop(next(iter(_facts_cache)))  # evict oldest
+            _facts_cache[key] = facts
+            return copy.deepcopy(facts)
+        log.warning(f"record_facts not called (attempt {attempt + 1}/{REPROMPT_TRIES}, stop_reason={r.stop_reason})")
 
-        log.info(f"Extracted facts from conversation for: {bullet_text[:50]}...")
-        return facts
-
-    except Exception as e:
-        log.exception(f"Failed to parse conversation facts: {e}")
-        # Return minimal structure
-        return {
-            "situation": "",
-            "actions": [],
-            "results": [],
-            "skills": [],
-            "tools": [],
-            "timeline": ""
-        }
+    log.error(f"Failed to extract conversation facts for: {bullet_text[:50]}...")
+    return _coerce_facts({})
 
 
 # =============================================================================
 # EXPERIMENTAL APPROACHES FOR A/B TESTING
 # =============================================================================
 
+def _freeze(value):
+    """Recursively convert lists/dicts to tuples so facts can be an lru_cache key."""
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+@functools.lru_cache(maxsize=512)
+def _format_facts_frozen(frozen_facts: tuple) -> str:
+    facts = dict(frozen_facts)
+    parts = []
+    if facts.get("situation"):
+        parts.append(f"Context: {facts['situation']}")
+    actions = facts.get("actions")
+    if isinstance(actions, tuple) and actions:
+        parts.append("Actions: " + "; ".join(actions))
+    results = facts.get("results")
+    if isinstance(results, tuple) and results:
+        parts.append("Results: " + "; ".join(results))
+    skills = facts.get("skills")
+    if isinstance(skills, tuple) and skills:
+        parts.append(f"Skills: {', '.join(skills)}")
+    tools = facts.get("tools")
+    if isinstance(tools, tuple) and tools:
+        parts.append(f"Tools: {', '.join(tools)}")
+    if facts.get("timeline"):
+        parts.append(f"Timeline: {facts['timeline']}")
+    return "\n".join(parts).strip()
+
+
 def _format_facts(stored_facts: Dict) -> str:
-    """Helper to format facts dictionary into readable text."""
-    facts_text = ""
-    if stored_facts.get("situation"):
-        facts_text += f"Context: {stored_facts['situation']}\n"
-    if stored_facts.get("actions"):
-        actions = stored_facts["actions"]
-        if isinstance(actions, list) and actions:
-            facts_text += "Actions: " + "; ".join(actions) + "\n"
-    if stored_facts.get("results"):
-        results = stored_facts["results"]
-        if isinstance(results, list) and results:
-            facts_text += "Results: " + "; ".join(results) + "\n"
-    if stored_facts.get("skills"):
-        skills = stored_facts["skills"]
-        if isinstance(skills, list) and skills:
-            facts_text += f"Skills: {', '.join(skills)}\n"
-    if stored_facts.get("tools"):
-        tools = stored_facts["tools"]
-        if isinstance(tools, list) and tools:
-            facts_text += f"Tools: {', '.join(tools)}\n"
-    if stored_facts.get("timeline"):
-        facts_text += f"Timeline: {stored_facts['timeline']}\n"
-    return facts_text.strip()
+    """Helper to format facts dictionary into readable text (memoized per facts content)."""
+    return _format_facts_frozen(_freeze(stored_facts or {}))
 
 
-def generate_bullet_self_critique(original_bullet: str, job_description: str,
-                                   stored_facts: Dict, char_limit: Optional[int] = None) -> str:
+# Structured output for strategies that return one or more bullets; replaces
+# "VERSION 1:" / numbered-list text parsing.
+BULLETS_TOOL = {
+    "name": "submit_bullets",
+    "description": "Submit the resume bullet(s) requested, in order.",
+    "input_schema": {
+        "type": "object",
+        "properties": {"bullets": {"type": "array", "items": {"type": "string"}}},
+        "required": ["bullets"],
+    },
+}
+
+
+def _submit_bullets(prompt: str, model: str, temperature: float, max_tokens: int,
+                    job_description: Optional[str] = None) -> List[str]:
     """
-    Self-Critique Loop: Generate -> Critique -> Revise
+    Call Claude with BULLETS_TOOL forced and return the submitted bullets (cleaned).
+
+    Positions are preserved: a blank entry comes back as "" so callers that map
+    bullets back to their inputs by index can substitute the original.
     """
-    if not client:
-        raise RuntimeError("ANTHROPIC_API_KEY missing")
+    r = client.messages.create(
+        model=model,
+        max_tokens=max_tokens,
+        tools=[BULLETS_TOOL],
+        tool_choice={"type": "tool", "name": BULLETS_TOOL["name"]},
+        messages=[{"role": "user", "content": _user_content(prompt, job_description)}],
+        temperature=temperature
+    )
+    block = next((b for b in r.content if getattr(b, "type", "") == "tool_use"), None)
+    bullets = block.input.get("bullets", []) if block else []
+    return [str(b).strip().lstrip("-• ").strip() for b in bullets]
 
-    has_facts = bool(stored_facts and any(stored_facts.get(c) for c in ["tools", "skills", "actions", "results", "situation", "timeline"]))
-    facts_text = _format_facts(stored_facts) if has_facts else ""
-    char_text = f"\nKeep under {char_limit} characters." if char_limit else ""
-    source = f"VERIFIED FACTS:\n{facts_text}" if has_facts else f"ORIGINAL BULLET:\n{original_bullet}"
 
-    log.info(f"generate_bullet_self_critique - '{original_bullet[:50]}...'")
+def _delimited_bullets(prompt: str, model: str, temperature: float, max_tokens: int,
+                       job_description: Optional[str] = None) -> List[str]:
+    """Plain-text variant of _submit_bullets: bullets come back separated by _BULLET_SEP (positions preserved)."""
+    r = client.messages.create(
+        model=model,
+        max_tokens=max_tokens,
+        messages=[{"role": "user", "content": _user_content(prompt, job_description)}],
+        temperature=temperature
+    )
+    raw = (r.content[0].text or "").strip().removeprefix(_BULLET_SEP).removesuffix(_BULLET_SEP)
+    return [b.strip().lstrip("-• ").strip() for b in raw.split(_BULLET_SEP)]
 
-    # STAGE 1: Generate
-    gen_prompt = f"""You are a resume writer who NEVER invents information.
 
+def _fused_json_call(prompt: str, temperature: float, max_tokens: int = 1024,
+                     job_description: Optional[str] = None) -> Optional[Dict]:
+    """
+    Single structured call used by the fused multi-stage strategies.
+
+    The model does the intermediate stages (drafts, critique) inside one response
+    and returns them as a JSON object. With FUSED_THINKING_BUDGET > 0 the critique
+    also gets an extended-thinking budget (which requires temperature=1), so the
+    result is not cached. Returns None when the response is not a JSON object;
+    callers then fall back to the sequential path.
+    """
+    kwargs = {"temperature": temperature, "max_tokens": max_tokens}
+    if FUSED_THINKING_BUDGET > 0:
+        kwargs = {"temperature": 1, "max_tokens": FUSED_THINKING_BUDGET + max_tokens,
+                  "thinking": {"type": "enabled", "budget_tokens": FUSED_THINKING_BUDGET}}
+        dont_cache()
+
+    r = client.messages.create(model=GEN_MODEL, messages=[{"role": "user", "content": _user_content(prompt, job_description)}], **kwargs)
+    raw = next((b.text for b in r.content if getattr(b, "type", "") == "text"), "").strip()
+
+    # Clean potential code fences
+    if raw.startswith("```"):
+        raw = raw.strip("`")
+        raw = _JSON_FENCE_RE.sub("", raw).strip()
+
+    try:
+        data = loads(raw)
+    except Exception:
+        data = None
+    if not isinstance(data, dict):
+        log.warning(f"  ⚠️  Fused response was not a JSON object, falling back to sequential stages")
+        dont_cache()
+        return None
+    return data
+
+
+def _self_critique_fused(source: str, job_description: str, char_text: str) -> Optional[str]:
+    """Generate -> Critique -> Revise in a single call returning {"draft","critique","final"}."""
+    prompt = ("You are a resume writer who NEVER invents information.\n\n"
+              + _XYZ_RULES + "\n" + _TOOLS_RULES + "\n" + _CONCISENESS_RULES + f"""
 {source}
 
 JOB DESCRIPTION:
 {job_description}
 
-FORMAT: Use Google's XYZ structure (vary your phrasing, not literal every time):
-- X = What you accomplished/delivered
-- Y = Measurable result/impact (only if in source!)
-- Z = How you did it (methods, tools, approach)
-Good examples: "Reduced costs 20% by automating...", "Led team of 8 to deliver...", "Built pipeline processing 1M records using..."
-
-TOOLS: Only mention tools that are:
-- Technical differentiators (Python, Tableau, Snowflake, etc.)
-- Explicitly mentioned in the JD
-- Essential to understanding the achievement
-OMIT basic tools: Excel, pivot tables, Word, PowerPoint, email, "various tools"
-
-CONCISENESS: Cut filler ruthlessly.
-- Use tool names directly: "SQL" not "SQL-based data extraction"
-- Cut meaningless phrases: "data-driven strategies", "leveraging insights", "utilizing methodologies"
-- Every word must earn its place - if removing it doesn't lose meaning, remove it
+Work in three steps inside ONE response:
+1. DRAFT a bullet following the FORMAT, TOOLS and CONCISENESS rules above.
+2. CRITIQUE the draft for FACTUAL ACCURACY first (does it contain ANY information not in the source?
+   That is the #1 failure), then XYZ structure, job relevance and concision.
+3. REVISE into the FINAL bullet. If the critique found added information, REMOVE IT.
+   A modest honest bullet beats an impressive lie.
 
 ⚠️ CONSTRAINT: Use ONLY information from the source above. Add nothing.
 If fit is poor, that's OK - write the best honest bullet you can.
 {char_text}
-Return ONLY the bullet."""
+Return ONLY valid JSON (no commentary, no code fences):
+{{"draft": "...", "critique": "...", "final": "..."}}""")
 
-    r1 = client.messages.create(model=CHAT_MODEL, max_tokens=512, messages=[{"role": "user", "content": gen_prompt}], temperature=0.2)
-    draft = (r1.content[0].text or "").strip().lstrip("-• ")
-    log.info(f"  Draft: '{draft[:60]}...'")
+    data = _fused_json_call(prompt, temperature=0.2, job_description=job_description)
+    if data is None:
+        return None
+    log.info(f"  Draft: '{str(data.get('draft', ''))[:60]}...'")
+    log.info(f"  Critique: '{str(data.get('critique', ''))[:60]}...'")
+    return str(data.get("final") or data.get("draft") or "").strip().lstrip("-• ") or None
 
-    # STAGE 2: Critique (focus on HONESTY not impressiveness)
-    critique_prompt = f"""Review this bullet for FACTUAL ACCURACY first, then quality.
 
-SOURCE MATERIAL:
-{source}
+@cached_llm_call(temperature=0.2)
+def generate_bullet_self_critique(original_bullet: str, job_description: str,
+                                   stored_facts: Dict, char_limit: Optional[int] = None) -> str:
+    """
+    Self-Critique Loop: Generate -> Critique -> Revise
+    """
+    if _should_skip_llm(original_bullet, stored_facts):
+        return original_bullet
 
-BULLET TO REVIEW:
-{draft}
+    if not client:
+        raise RuntimeError("ANTHROPIC_API_KEY missing")
+    job_description = _canon_jd(job_description)
 
-Check:
-1. Does the bullet contain ANY information not in the source? (This is a failure)
-2. Does it follow XYZ structure (accomplishment + result + method)? Phrasing can vary.
-3. Is it relevant to the job?
-4. Is it concise? Flag verbose filler like:
-   - "SQL-based data extraction" (should be "SQL")
-   - "data-driven strategies", "leveraging insights", "utilizing methodologies"
-   - Any phrase that can be cut without losing meaning
+    has_facts = _has_any_facts(stored_facts)
+    facts_text = _format_facts(stored_facts) if has_facts else ""
+    char_text = f"\nKeep under {char_limit} characters." if char_limit else ""
+    source = f"VERIFIED FACTS:\n{facts_text}" if has_facts else f"ORIGINAL BULLET:\n{original_bullet}"
 
-List specific issues. If it added information not in source, that's the #1 problem."""
+    log.info(f"generate_bullet_self_critique - '{original_bullet[:50]}...' (strategy={MULTI_STAGE_STRATEGY})")
 
-    r2 = client.messages.create(model=CHAT_MODEL, max_tokens=512, messages=[{"role": "user", "content": critique_prompt}], temperature=0.1)
-    critique = (r2.content[0].text or "").strip()
-    log.info(f"  Critique: '{critique[:60]}...'")
+    if MULTI_STAGE_STRATEGY == "fused":
+        final = _self_critique_fused(source, job_description, char_text)
+        if final is not None:
+            log.info(f"  Final: '{final[:60]}...'")
+            return final
 
-    # STAGE 3: Revise
-    revise_prompt = f"""Revise this bullet based on the critique.
+    # STAGE 1: Generate
+    gen_prompt = _GEN_TEMPLATE.format(job_description=job_description, source=source, char_text=char_text)
 
-BULLET: {draft}
-CRITIQUE: {critique}
+    draft = _generate_bullet_text(gen_prompt, GEN_MODEL, temperature=0.2, char_limit=char_limit, max_tokens=_max_tok_for_chars(char_limit), job_description=job_description).lstrip("-• ")
+    log.info(f"  Draft: '{draft[:60]}...'")
 
-SOURCE (your ONLY allowed information):
-{source}
+    # STAGE 2: Critique (focus on HONESTY not impressiveness)
+    critique_prompt = _CRITIQUE_TEMPLATE.format(source=source, draft=draft)
 
-FORMAT: Use Google's XYZ structure (vary your phrasing):
-- X = What you accomplished/delivered
-- Y = Measurable result/impact (only if in source!)
-- Z = How you did it
+    r2 = client.messages.create(model=CRITIQUE_MODEL, max_tokens=512, messages=[{"role": "user", "content": critique_prompt}], temperature=0.1)
+    critique = (r2.content[0].text or "").strip()
+    log.info(f"  Critique: '{critique[:60]}...'")
 
-⚠️ If critique says you added information, REMOVE IT. Only use source material.
-A modest honest bullet beats an impressive lie.
-{char_text}
-Return ONLY the revised bullet."""
+    # STAGE 3: Revise
+    revise_prompt = _REVISE_TEMPLATE.format(source=source, draft=draft, critique=critique, char_text=char_text)
 
-    r3 = client.messages.create(model=CHAT_MODEL, max_tokens=512, messages=[{"role": "user", "content": revise_prompt}], temperature=0.2)
-    final = (r3.content[0].text or "").strip().lstrip("-• ")
+    final = _generate_bullet_text(revise_prompt, GEN_MODEL, temperature=0.2, char_limit=char_limit, max_tokens=_max_tok_for_chars(char_limit), job_description=job_description).lstrip("-• ")
     log.info(f"  Final: '{final[:60]}...'")
     return final
 
 
+@cached_llm_call(temperature=0.3)
 def generate_bullet_multi_candidate(original_bullet: str, job_description: str,
                                      stored_facts: Dict, char_limit: Optional[int] = None) -> str:
     """
     Multi-Candidate: Generate 3 variants -> Select best
     """
+    if _should_skip_llm(original_bullet, stored_facts):
+        return original_bullet
+
     if not client:
         raise RuntimeError("ANTHROPIC_API_KEY missing")
+    job_description = _canon_jd(job_description)
 
-    has_facts = bool(stored_facts and any(stored_facts.get(c) for c in ["tools", "skills", "actions", "results", "situation", "timeline"]))
+    has_facts = _has_any_facts(stored_facts)
     facts_text = _format_facts(stored_facts) if has_facts else ""
     char_text = f"\nEach under {char_limit} chars." if char_limit else ""
     source = f"VERIFIED FACTS:\n{facts_text}" if has_facts else f"ORIGINAL BULLET:\n{original_bullet}"
@@ -1068,13 +1487,14 @@ FORMAT: Use Google's XYZ structure (vary your phrasing across versions):
 
 Generate 3 different versions (vary structure, emphasis, and phrasing - NOT facts):
 {char_text}
-VERSION 1: [bullet]
-VERSION 2: [bullet]
-VERSION 3: [bullet]"""
+Submit the 3 versions with submit_bullets."""
 
-    r1 = client.messages.create(model=CHAT_MODEL, max_tokens=1024, messages=[{"role": "user", "content": gen_prompt}], temperature=0.3)
-    candidates = (r1.content[0].text or "").strip()
-    log.info(f"  Generated 3 candidates")
+    candidate_list = [c for c in _submit_bullets(gen_prompt, CHAT_MODEL, temperature=0.3, max_tokens=1024, job_description=job_description) if c]
+    if not candidate_list:
+        log.warning(f"  ⚠️  No candidates returned, using original bullet")
+        return original_bullet
+    candidates = "\n".join(f"{i+1}. {c}" for i, c in enumerate(candidate_list))
+    log.info(f"  Generated {len(candidate_list)} candidates")
 
     # STAGE 2: Select best (prioritize honesty)
     select_prompt = f"""Pick the BEST bullet from these candidates.
@@ -1090,13 +1510,10 @@ Evaluate:
 2. Relevance to job
 3. Conciseness
 
-Return ONLY the winning bullet text (no "VERSION X:")."""
+Submit ONLY the winning bullet text (unchanged) with submit_bullets."""
 
-    r2 = client.messages.create(model=CHAT_MODEL, max_tokens=256, messages=[{"role": "user", "content": select_prompt}], temperature=0)
-    selected = (r2.content[0].text or "").strip().lstrip("-• ")
-    for prefix in ["VERSION 1:", "VERSION 2:", "VERSION 3:", "Winner:", "Best:"]:
-        if selected.upper().startswith(prefix.upper()):
-            selected = selected[len(prefix):].strip()
+    winners = _submit_bullets(select_prompt, CRITIQUE_MODEL, temperature=0, max_tokens=256, job_description=job_description)
+    selected = winners[0] if winners and winners[0] else candidate_list[0]
     log.info(f"  Selected: '{selected[:60]}...'")
     return selected
 
@@ -1377,7 +1794,7 @@ Return the improved bullets in the SAME ORDER, one per line, numbered 1-{len(opt
 
     for line in lines:
         # Strip number prefix if present (e.g., "1. " or "1) ")
-        cleaned = re.sub(r'^\s*\d+[\.\)]\s*', '', line).strip().lstrip("-• ")
+        cleaned = _NUMBERED_RE.sub("", line).strip().lstrip("-• ")
         if cleaned:  # Only add non-empty lines
             deduplicated.append(cleaned)
 
@@ -1391,59 +1808,47 @@ Return the improved bullets in the SAME ORDER, one per line, numbered 1-{len(opt
     return deduplicated
 
 
+@cached_llm_call(temperature=0.2)
 def generate_bullet_hiring_manager(original_bullet: str, job_description: str,
                                     stored_facts: Dict, char_limit: Optional[int] = None) -> str:
     """
     Hiring Manager Perspective: Write as the evaluator
     """
+    if _should_skip_llm(original_bullet, stored_facts):
+        return original_bullet
+
     if not client:
         raise RuntimeError("ANTHROPIC_API_KEY missing")
+    job_description = _canon_jd(job_description)
 
-    has_facts = bool(stored_facts and any(stored_facts.get(c) for c in ["tools", "skills", "actions", "results", "situation", "timeline"]))
+    has_facts = _has_any_facts(stored_facts)
     facts_text = _format_facts(stored_facts) if has_facts else ""
     char_text = f"\nKeep under {char_limit} characters." if char_limit else ""
     source = f"VERIFIED FACTS:\n{facts_text}" if has_facts else f"ORIGINAL BULLET:\n{original_bullet}"
 
     log.info(f"generate_bullet_hiring_manager - '{original_bullet[:50]}...'")
 
-    system = """You're an experienced hiring manager who VALUES HONESTY over impressiveness.
+    user = _HIRING_TEMPLATE.format(job_description=job_description, source=source, char_text=char_text)
 
-You know:
-- A candidate who embellishes is a red flag
-- Modest but verifiable beats impressive but vague
-- You'd rather see "Analyzed data" than "Leveraged advanced analytics to drive strategic insights"
-- Specifics from the actual work matter more than buzzwords"""
-
-    user = f"""I'm hiring for:
-{job_description}
-
-Candidate's VERIFIED information (this is ALL you can use):
-{source}
-
-FORMAT: Use XYZ structure (vary phrasing naturally):
-- What they accomplished + measurable result (if available) + how they did it
-- Examples: "Reduced costs 20% by automating...", "Led team of 8 to deliver...", "Built pipeline processing 1M records using..."
-
-Rewrite as a bullet I'd trust. Use ONLY the information above - add nothing.
-If their experience doesn't match my job well, that's fine - I prefer an honest modest bullet over an impressive fake one.
-{char_text}
-Return ONLY the bullet."""
-
-    r = client.messages.create(model=CHAT_MODEL, max_tokens=512, system=system, messages=[{"role": "user", "content": user}], temperature=0.2)
-    result = (r.content[0].text or "").strip().lstrip("-• ")
+    result = _generate_bullet_text(user, CHAT_MODEL, temperature=0.2, char_limit=char_limit, max_tokens=_max_tok_for_chars(char_limit), system=_HIRING_SYSTEM, job_description=job_description).lstrip("-• ")
     log.info(f"  Result: '{result[:60]}...'")
     return result
 
 
+@cached_llm_call(temperature=0.2)
 def generate_bullet_jd_mirror(original_bullet: str, job_description: str,
                                stored_facts: Dict, char_limit: Optional[int] = None) -> str:
     """
     JD-Mirroring: Extract JD phrases -> Incorporate them (without adding facts)
     """
+    if _should_skip_llm(original_bullet, stored_facts):
+        return original_bullet
+
     if not client:
         raise RuntimeError("ANTHROPIC_API_KEY missing")
+    job_description = _canon_jd(job_description)
 
-    has_facts = bool(stored_facts and any(stored_facts.get(c) for c in ["tools", "skills", "actions", "results", "situation", "timeline"]))
+    has_facts = _has_any_facts(stored_facts)
     facts_text = _format_facts(stored_facts) if has_facts else ""
     char_text = f"\nKeep under {char_limit} characters." if char_limit else ""
     source = f"VERIFIED FACTS:\n{facts_text}" if has_facts else f"ORIGINAL BULLET:\n{original_bullet}"
@@ -1463,7 +1868,7 @@ List 2-4 JD phrases where the candidate has DEMONSTRATED that skill/action.
 Only include phrases where there's a real match - don't stretch.
 If few phrases match, that's OK - list only genuine matches."""
 
-    r1 = client.messages.create(model=CHAT_MODEL, max_tokens=256, messages=[{"role": "user", "content": extract_prompt}], temperature=0)
+    r1 = client.messages.create(model=CRITIQUE_MODEL, max_tokens=256, messages=[{"role": "user", "content": extract_prompt}], temperature=0)
     phrases = (r1.content[0].text or "").strip()
     log.info(f"  JD phrases: '{phrases[:60]}...'")
 
@@ -1490,12 +1895,47 @@ A modest honest bullet with some JD keywords beats an impressive lie.
 {char_text}
 Return ONLY the bullet."""
 
-    r2 = client.messages.create(model=CHAT_MODEL, max_tokens=512, messages=[{"role": "user", "content": rewrite}], temperature=0.2)
-    result = (r2.content[0].text or "").strip().lstrip("-• ")
+    result = _generate_bullet_text(rewrite, CHAT_MODEL, temperature=0.2, char_limit=char_limit, max_tokens=_max_tok_for_chars(char_limit), job_description=job_description).lstrip("-• ")
     log.info(f"  Result: '{result[:60]}...'")
     return result
 
 
+def _combined_fused(source: str, job_description: str, char_text: str) -> Optional[str]:
+    """Candidates -> Critique -> Refine in a single call returning {"versions","scores","final"}."""
+    prompt = ("You are a resume writer who NEVER invents information.\n\n"
+              + _XYZ_RULES + "\n" + _TOOLS_RULES + f"""
+{source}
+
+JOB DESCRIPTION:
+{job_description}
+
+Work in three steps inside ONE response:
+1. Write 3 different versions following the FORMAT and TOOLS rules above
+   (vary structure, emphasis, and phrasing across versions - NOT facts).
+2. Score each version 1-5 on factual accuracy (5 = perfectly faithful, 1 = fabricates information).
+   Adding ANY metric, tool, or detail not in the source is a CRITICAL FAILURE.
+3. Take the version with the highest score and refine it into the FINAL bullet.
+   Fix issues by REMOVING fabricated information (not adding more).
+   A modest honest bullet beats an impressive lie.
+
+⚠️ CONSTRAINT: Each version can ONLY use information from the source above.
+- No added metrics, tools, or details
+- If fit is poor, that's OK - write honest variations
+{char_text}
+Return ONLY valid JSON (no commentary, no code fences):
+{{"versions": ["...", "...", "..."], "scores": [5, 4, 3], "final": "..."}}""")
+
+    data = _fused_json_call(prompt, temperature=0.3, job_description=job_description)
+    if data is None:
+        return None
+    log.info(f"  Scores: {data.get('scores')}")
+    final = str(data.get("final") or "").strip()
+    if not final and data.get("versions"):
+        final = str(data["versions"][0]).strip()
+    return final.lstrip("-• ") or None
+
+
+@cached_llm_call(temperature=0.3)
 def generate_bullet_combined(original_bullet: str, job_description: str,
                               stored_facts: Dict, char_limit: Optional[int] = None) -> str:
     """
@@ -1506,15 +1946,25 @@ def generate_bullet_combined(original_bullet: str, job_description: str,
 
     This combines the creativity of multi-candidate with the factual rigor of self-critique.
     """
+    if _should_skip_llm(original_bullet, stored_facts):
+        return original_bullet
+
     if not client:
         raise RuntimeError("ANTHROPIC_API_KEY missing")
+    job_description = _canon_jd(job_description)
 
-    has_facts = bool(stored_facts and any(stored_facts.get(c) for c in ["tools", "skills", "actions", "results", "situation", "timeline"]))
+    has_facts = _has_any_facts(stored_facts)
     facts_text = _format_facts(stored_facts) if has_facts else ""
     char_text = f"\nEach under {char_limit} chars." if char_limit else ""
     source = f"VERIFIED FACTS:\n{facts_text}" if has_facts else f"ORIGINAL BULLET:\n{original_bullet}"
 
-    log.info(f"generate_bullet_combined - '{original_bullet[:50]}...'")
+    log.info(f"generate_bullet_combined - '{original_bullet[:50]}...' (strategy={MULTI_STAGE_STRATEGY})")
+
+    if MULTI_STAGE_STRATEGY == "fused":
+        final = _combined_fused(source, job_description, char_text)
+        if final is not None:
+            log.info(f"  Final: '{final[:60]}...'")
+            return final
 
     # STAGE 1: Generate 3 candidates (same as multi_candidate)
     gen_prompt = f"""You are a resume writer who NEVER invents information.
@@ -1535,13 +1985,14 @@ FORMAT: Use Google's XYZ structure (vary your phrasing across versions):
 
 Generate 3 different versions (vary structure, emphasis, and phrasing - NOT facts):
 {char_text}
-VERSION 1: [bullet]
-VERSION 2: [bullet]
-VERSION 3: [bullet]"""
+Submit the 3 versions with submit_bullets."""
 
-    r1 = client.messages.create(model=CHAT_MODEL, max_tokens=1024, messages=[{"role": "user", "content": gen_prompt}], temperature=0.3)
-    candidates_raw = (r1.content[0].text or "").strip()
-    log.info(f"  Generated 3 candidates")
+    candidate_list = [c for c in _submit_bullets(gen_prompt, CHAT_MODEL, temperature=0.3, max_tokens=1024, job_description=job_description) if c]
+    if not candidate_list:
+        log.warning(f"  ⚠️  No candidates returned, using original bullet")
+        return original_bullet
+    candidates_raw = "\n".join(f"VERSION {i+1}: {c}" for i, c in enumerate(candidate_list))
+    log.info(f"  Generated {len(candidate_list)} candidates")
 
     # STAGE 2: Critique ALL candidates for factual accuracy
     critique_prompt = f"""Review these 3 bullet candidates for FACTUAL ACCURACY.
@@ -1564,7 +2015,7 @@ VERSION 2: [score] - [brief reason]
 VERSION 3: [score] - [brief reason]
 BEST: [version number]"""
 
-    r2 = client.messages.create(model=CHAT_MODEL, max_tokens=512, messages=[{"role": "user", "content": critique_prompt}], temperature=0)
+    r2 = client.messages.create(model=CRITIQUE_MODEL, max_tokens=512, messages=[{"role": "user", "content": critique_prompt}], temperature=0)
     critique = (r2.content[0].text or "").strip()
     log.info(f"  Critique: '{critique[:100]}...'")
 
@@ -1584,20 +2035,127 @@ Take the version with highest factual accuracy score.
 If it had any issues noted, fix them by REMOVING fabricated information (not adding more).
 A modest honest bullet beats an impressive lie.
 {char_text}
-Return ONLY the final refined bullet."""
+Submit ONLY the final refined bullet with submit_bullets."""
 
-    r3 = client.messages.create(model=CHAT_MODEL, max_tokens=256, messages=[{"role": "user", "content": revise_prompt}], temperature=0.1)
-    final = (r3.content[0].text or "").strip().lstrip("-• ")
-
-    # Clean up any version prefixes
-    for prefix in ["VERSION 1:", "VERSION 2:", "VERSION 3:", "Winner:", "Best:", "FINAL:"]:
-        if final.upper().startswith(prefix.upper()):
-            final = final[len(prefix):].strip()
+    refined = _submit_bullets(revise_prompt, CHAT_MODEL, temperature=0.1, max_tokens=256, job_description=job_description)
+    final = refined[0] if refined and refined[0] else candidate_list[0]
 
     log.info(f"  Final: '{final[:60]}...'")
     return final
 
 
+STRATEGY_NAMES = ("self_critique", "multi_candidate", "hiring_manager", "jd_mirror", "combined")
+
+STRATEGIES_TOOL = {
+    "name": "submit_strategy_bullets",
+    "description": "Submit one final bullet per rewriting strategy.",
+    "input_schema": {
+        "type": "object",
+        "properties": {name: {"type": "string"} for name in STRATEGY_NAMES},
+        "required": list(STRATEGY_NAMES),
+    },
+}
+
+_ALL_STRATEGIES_SYSTEM = """You are a resume writer who NEVER invents information.
+Rewrite ONE source bullet five times, once per strategy, and submit all five with submit_strategy_bullets.
+
+Strategies:
+- self_critique: draft a bullet, critique it for added information, XYZ structure and concision, then submit the revised bullet.
+- multi_candidate: write 3 versions varying structure and emphasis (NOT facts) and submit the best one.
+- hiring_manager: write as an honest hiring manager who prefers a modest verifiable bullet over an impressive vague one.
+- jd_mirror: reuse JD terminology ONLY where it describes what the candidate actually did.
+- combined: write 3 versions, score each for factual accuracy, and submit the most faithful one after refining it.
+
+""" + _XYZ_RULES + """
+⚠️ CONSTRAINT: Every strategy uses ONLY information from the source. Add nothing.
+A modest honest bullet beats an impressive lie."""
+
+
+def generate_bullet_all_strategies(original_bullet: str, job_description: str,
+                                   stored_facts: Dict, char_limit: Optional[int] = None) -> Dict[str, str]:
+    """
+    All A/B strategies in one call: the source and JD are sent once and a forced tool
+    returns a bullet per strategy in STRATEGY_NAMES. Used by the evaluation harness
+    (--single-call) in place of one round trip chain per strategy.
+    """
+    if _should_skip_llm(original_bullet, stored_facts):
+        return {name: original_bullet for name in STRATEGY_NAMES}
+
+    if not client:
+        raise RuntimeError("ANTHROPIC_API_KEY missing")
+    job_description = _canon_jd(job_description)
+
+    has_facts = _has_any_facts(stored_facts)
+    facts_text = _format_facts(stored_facts) if has_facts else ""
+    char_text = f"\nKeep every bullet under {char_limit} characters." if char_limit else ""
+    source = f"VERIFIED FACTS:\n{facts_text}" if has_facts else f"ORIGINAL BULLET:\n{original_bullet}"
+
+    log.info(f"generate_bullet_all_strategies - '{original_bullet[:50]}...'")
+
+    r = client.messages.create(
+        model=CHAT_MODEL,
+        max_tokens=1024,
+        system=_ALL_STRATEGIES_SYSTEM,
+        tools=[STRATEGIES_TOOL],
+        tool_choice={"type": "tool", "name": STRATEGIES_TOOL["name"]},
+        messages=[{"role": "user", "content": _user_content(f"JOB DESCRIPTION:\n{job_description}\n\n{source}\n{char_text}", job_description)}],
+        temperature=0.2
+    )
+    block = next((b for b in r.content if getattr(b, "type", "") == "tool_use"), None)
+    data = block.input if block else {}
+
+    results = {}
+    for name in STRATEGY_NAMES:
+        bullet = str(data.get(name) or "").strip().lstrip("-• ").strip()
+        if not bullet:
+            log.warning(f"  {name} missing from response, using original")
+            bullet = original_bullet
+        results[name] = bullet
+        log.info(f"  {name}: '{bullet[:60]}...'")
+    return results
+
+
+_BATCH_DEDUP_SIM = 0.9
+
+
+def _batch_canonical_indices(bullets_data: List[Dict]) -> List[int]:
+    """
+    Map each bullet to the index of its canonical copy. Bullets with identical facts
+    share one canonical entry when their normalized originals are identical, or when
+    they embed with cosine >= _BATCH_DEDUP_SIM and contain the same numbers (so
+    "cut costs 20%" and "cut costs 35%" stay separate); everything else maps to itself.
+    """
+    canon = list(range(len(bullets_data)))
+    if len(bullets_data) < 2:
+        return canon
+    texts = [item.get("original_bullet", "") or " " for item in bullets_data]
+    normalized = [_WS_RE.sub(" ", t).strip().lower() for t in texts]
+    numbers = [frozenset(_NUMBER_RE.findall(t)) for t in texts]
+    facts = [_freeze(item.get("stored_facts") or {}) for item in bullets_data]
+
+    sims = None
+    if openai_client and len(set(normalized)) > 1:
+        try:
+            embeddings = embed_many(texts)
+        except Exception as e:
+            log.warning(f"  Batch dedup limited to exact matches, embedding failed: {e}")
+        else:
+            vecs = np.asarray(embeddings, dtype=np.float32)
+            norms = np.linalg.norm(vecs, axis=1, keepdims=True)
+            vecs = vecs / np.where(norms == 0, 1.0, norms)
+            sims = vecs @ vecs.T
+
+    for i in range(1, len(bullets_data)):
+        for j in range(i):
+            if canon[j] != j or facts[i] != facts[j]:
+                continue
+            if normalized[i] == normalized[j] or (
+                    sims is not None and sims[i, j] >= _BATCH_DEDUP_SIM and numbers[i] == numbers[j]):
+                canon[i] = j
+                break
+    return canon
+
+
 def generate_bullets_batch(bullets_data: List[Dict], job_description: str,
                            char_limit: Optional[int] = None) -> List[str]:
     """
@@ -1618,18 +2176,26 @@ def generate_bullets_batch(bullets_data: List[Dict], job_description: str,
     """
     if not client:
         raise RuntimeError("ANTHROPIC_API_KEY missing")
+    job_description = _canon_jd(job_description)
 
     if not bullets_data:
         return []
 
     log.info(f"generate_bullets_batch - Processing {len(bullets_data)} bullets together")
 
+    # Near-duplicate originals are sent once and the result is broadcast back
+    canon = _batch_canonical_indices(bullets_data)
+    unique_idx = [i for i, c in enumerate(canon) if c == i]
+    unique_data = [bullets_data[i] for i in unique_idx]
+    if len(unique_data) < len(bullets_data):
+        log.info(f"  Deduplicated {len(bullets_data)} bullets to {len(unique_data)}")
+
     # Format all bullets with their facts
     bullets_formatted = []
-    for i, item in enumerate(bullets_data, 1):
+    for i, item in enumerate(unique_data, 1):
         original = item.get("original_bullet", "")
         facts = item.get("stored_facts", {})
-        has_facts = bool(facts and any(facts.get(c) for c in ["tools", "skills", "actions", "results", "situation", "timeline"]))
+        has_facts = _has_any_facts(facts)
 
         if has_facts:
             facts_text = _format_facts(facts)
@@ -1641,74 +2207,33 @@ def generate_bullets_batch(bullets_data: List[Dict], job_description: str,
     char_text = f"\nKeep each bullet under {char_limit} characters." if char_limit else ""
 
     # Single-stage batch generation with coherence instructions
-    batch_prompt = f"""You are a resume writer optimizing a SET of bullets together. NEVER invent information.
-
-JOB DESCRIPTION:
-{job_description}
-
-BULLETS TO OPTIMIZE:
-{bullets_section}
+    batch_prompt = _BATCH_TEMPLATE.format(job_description=job_description, count=len(unique_data),
+                                          bullets_section=bullets_section, char_text=char_text)
 
-FORMAT: Use Google's XYZ structure (vary phrasing across bullets):
-- X = What you accomplished/delivered
-- Y = Measurable result/impact (only if in source!)
-- Z = How you did it (methods, tools, approach)
-Good examples: "Reduced costs 20% by automating...", "Led team of 8 to deliver...", "Built pipeline processing 1M records using..."
-
-⚠️ CRITICAL CONSTRAINTS:
-- For each bullet, use ONLY the facts provided (or original if no facts)
-- Do NOT add metrics, tools, or details not in the source
-- If a bullet doesn't fit the job well, write the best honest version
-
-BATCH OPTIMIZATION GOALS:
-1. Vary sentence structures and XYZ phrasing across bullets (don't start all with same pattern)
-2. Distribute JD keywords strategically (don't repeat same keywords in every bullet)
-3. Lead with strongest/most relevant bullets' content
-4. Ensure each bullet stands alone but together tells a cohesive story
-{char_text}
-
-Return exactly {len(bullets_data)} bullets, numbered:
-1. [bullet]
-2. [bullet]
-...
-
-Return ONLY the numbered bullets, no commentary."""
-
-    r = client.messages.create(model=CHAT_MODEL, max_tokens=2048, messages=[{"role": "user", "content": batch_prompt}], temperature=0.2)
-    response = (r.content[0].text or "").strip()
-
-    # Parse numbered bullets from response
-    enhanced_bullets = []
-    lines = response.split("\n")
-    current_bullet = ""
+    batch_max_tokens = _max_tok_for_chars(char_limit) * len(unique_data) + 128
+    if BATCH_OUTPUT_FORMAT == "delimiter":
+        unique_bullets = _delimited_bullets(batch_prompt, CHAT_MODEL, temperature=0.2, max_tokens=batch_max_tokens, job_description=job_description)
+    else:
+        unique_bullets = _submit_bullets(batch_prompt, CHAT_MODEL, temperature=0.2, max_tokens=batch_max_tokens, job_description=job_description)
 
-    for line in lines:
-        line = line.strip()
-        if not line:
-            continue
-        # Check if line starts with a number
-        match = re.match(r'^(\d+)[.):]\s*(.+)$', line)
-        if match:
-            if current_bullet:
-                enhanced_bullets.append(current_bullet.lstrip("-• "))
-            current_bullet = match.group(2)
-        elif current_bullet:
-            # Continuation of previous bullet
-            current_bullet += " " + line
-
-    # Don't forget the last bullet
-    if current_bullet:
-        enhanced_bullets.append(current_bullet.lstrip("-• "))
+    # Blank entries keep their position; fall back to that bullet's original
+    for idx, bullet in enumerate(unique_bullets[:len(unique_data)]):
+        if not bullet:
+            unique_bullets[idx] = unique_data[idx].get("original_bullet", "")
+            log.warning(f"  Bullet {idx+1} blank in batch response, using original")
 
     # Ensure we have the right number of bullets
-    while len(enhanced_bullets) < len(bullets_data):
+    while len(unique_bullets) < len(unique_data):
         # Fallback: use original bullet
-        idx = len(enhanced_bullets)
-        enhanced_bullets.append(bullets_data[idx].get("original_bullet", ""))
+        idx = len(unique_bullets)
+        unique_bullets.append(unique_data[idx].get("original_bullet", ""))
         log.warning(f"  Bullet {idx+1} missing from batch response, using original")
 
     # Trim if we got too many
-    enhanced_bullets = enhanced_bullets[:len(bullets_data)]
+    unique_bullets = unique_bullets[:len(unique_data)]
+
+    position = {orig: k for k, orig in enumerate(unique_idx)}
+    enhanced_bullets = [unique_bullets[position[c]] for c in canon]
 
     for i, bullet in enumerate(enhanced_bullets):
         log.info(f"  Bullet {i+1}: '{bullet[:60]}...'")
@@ -1942,8 +2467,7 @@ def optimize_keywords_with_context(original_bullet: str, job_description: str,
     if not client:
         raise RuntimeError("ANTHROPIC_API_KEY missing")
 
-    has_facts = bool(stored_facts and any(stored_facts.get(c) for c in
-                     ["tools", "skills", "actions", "results", "situation", "timeline"]))
+    has_facts = _has_any_facts(stored_facts)
 
     log.info(f"optimize_keywords_with_context - '{original_bullet[:50]}...' (has_facts: {has_facts})")
     char_text = f"\nKeep under {char_limit} characters." if char_limit else ""
@@ -2068,15 +2592,13 @@ Return ONLY the winning bullet text (no "VERSION X:")."""
         temperature=0
     )
 
-    selected = (r2.content[0].text or "").strip().lstrip("-• ")
-    for prefix in ["VERSION 1:", "VERSION 2:", "VERSION 3:", "Winner:", "Best:"]:
-        if selected.upper().startswith(prefix.upper()):
-            selected = selected[len(prefix):].strip()
+    selected = _PREFIX_RE.sub("", (r2.content[0].text or "").strip().lstrip("-• "), count=1).strip()
 
     log.info(f"  Selected: '{selected[:60]}...'")
     return selected
 
 
+@cached_llm_call(temperature=0.2)
 def generate_bullet_metrics_and_tools(original_bullet: str, job_description: str,
                                        stored_facts: Dict, char_limit: Optional[int] = None) -> str:
     """
@@ -2104,8 +2626,12 @@ def generate_bullet_metrics_and_tools(original_bullet: str, job_description: str
     Returns:
         Enhanced bullet (or minimal keyword optimization if no metrics/tools to add)
     """
+    if _should_skip_llm(original_bullet, stored_facts):
+        return original_bullet
+
     if not client:
         raise RuntimeError("ANTHROPIC_API_KEY missing")
+    job_description = _canon_jd(job_description)
 
     log.info(f"generate_bullet_metrics_and_tools - '{original_bullet[:50]}...'")
 
@@ -2119,9 +2645,8 @@ def generate_bullet_metrics_and_tools(original_bullet: str, job_description: str
         results = stored_facts.get("results", [])
         if results:
             # Look for numbers, percentages, dollar amounts in results
-            import re
             for result in results:
-                if re.search(r'\d+[%$KMB]|\d+\+|\d{1,3}(,\d{3})*', str(result)):
+                if _METRIC_RE.search(str(result)):
                     has_metrics = True
                     break
 
@@ -2139,9 +2664,7 @@ def generate_bullet_metrics_and_tools(original_bullet: str, job_description: str
         timeline = stored_facts.get("timeline", "")
         if situation or timeline:
             # Look for team size, budget, duration indicators
-            import re
-            scope_indicators = r'\d+\s*(person|people|member|month|year|week|K|M|B|\$)'
-            if re.search(scope_indicators, situation + timeline, re.IGNORECASE):
+            if _SCOPE_RE.search(situation + timeline):
                 has_scope = True
 
     meaningful_enhancements = has_metrics or has_jd_tools or has_scope
@@ -2154,37 +2677,7 @@ def generate_bullet_metrics_and_tools(original_bullet: str, job_description: str
         return optimize_keywords_light_touch(original_bullet, job_description, stored_facts, char_limit)
 
     # Build facts context showing ONLY the enhancement-worthy information
-    facts_text = ""
-
-    if stored_facts.get("situation"):
-        facts_text += f"Situation/Context: {stored_facts['situation']}\n"
-
-    if stored_facts.get("actions"):
-        actions = stored_facts["actions"]
-        if isinstance(actions, list) and actions:
-            facts_text += "Actions Taken:\n"
-            for item in actions:
-                facts_text += f"• {item}\n"
-
-    if stored_facts.get("results"):
-        results = stored_facts["results"]
-        if isinstance(results, list) and results:
-            facts_text += "Results/Achievements:\n"
-            for item in results:
-                facts_text += f"• {item}\n"
-
-    if stored_facts.get("skills"):
-        skills = stored_facts["skills"]
-        if isinstance(skills, list) and skills:
-            facts_text += f"Skills: {', '.join(skills)}\n"
-
-    if stored_facts.get("tools"):
-        tools = stored_facts["tools"]
-        if isinstance(tools, list) and tools:
-            facts_text += f"Tools/Technologies: {', '.join(tools)}\n"
-
-    if stored_facts.get("timeline"):
-        facts_text += f"Timeline: {stored_facts['timeline']}\n"
+    facts_text = _format_facts_detailed(stored_facts)
 
     char_text = f"\nIMPORTANT: Keep the bullet under {char_limit} characters." if char_limit else ""
 
@@ -2231,14 +2724,7 @@ FORMAT: Use XYZ structure naturally (not formulaic):
 {char_text}
 Return ONLY the enhanced bullet. No explanation."""
 
-    response = client.messages.create(
-        model=CHAT_MODEL,
-        max_tokens=1024,
-        messages=[{"role": "user", "content": prompt}],
-        temperature=0.2
-    )
-
-    enhanced = (response.content[0].text or "").strip().lstrip("-• ")
+    enhanced = _generate_bullet_text(prompt, CHAT_MODEL, temperature=0.2, char_limit=char_limit, job_description=job_description).lstrip("-• ")
 
     log.info(f"  → Metrics/tools result: '{enhanced[:80]}...'")
     return enhanced
@@ -2310,8 +2796,12 @@ async def generate_bullet_metrics_and_tools_async(original_bullet: str, job_desc
     Metrics & Tools Enhancement: ONLY add value when there's actual value to add.
     This function checks for quantitative enhancements and routes to the appropriate strategy.
     """
+    if _should_skip_llm(original_bullet, stored_facts):
+        return original_bullet
+
     if not async_client:
         raise RuntimeError("ANTHROPIC_API_KEY missing or async_client not initialized")
+    job_description = _canon_jd(job_description)
 
     log.info(f"generate_bullet_metrics_and_tools_async - '{original_bullet[:50]}...'")
 
@@ -2325,9 +2815,8 @@ async def generate_bullet_metrics_and_tools_async(original_bullet: str, job_desc
         results = stored_facts.get("results", [])
         if results:
             # Look for numbers, percentages, dollar amounts in results
-            import re
             for result in results:
-                if re.search(r'\d+[%$KMB]|\d+\+|\d{1,3}(,\d{3})*', str(result)):
+                if _METRIC_RE.search(str(result)):
                     has_metrics = True
                     break
 
@@ -2345,9 +2834,7 @@ async def generate_bullet_metrics_and_tools_async(original_bullet: str, job_desc
         timeline = stored_facts.get("timeline", "")
         if situation or timeline:
             # Look for team size, budget, duration indicators
-            import re
-            scope_indicators = r'\d+\s*(person|people|member|month|year|week|K|M|B|\$)'
-            if re.search(scope_indicators, situation + timeline, re.IGNORECASE):
+            if _SCOPE_RE.search(situation + timeline):
                 has_scope = True
 
     meaningful_enhancements = has_metrics or has_jd_tools or has_scope
@@ -2360,37 +2847,7 @@ async def generate_bullet_metrics_and_tools_async(original_bullet: str, job_desc
         return await optimize_keywords_light_touch_async(original_bullet, job_description, stored_facts, char_limit)
 
     # Build facts context showing ONLY the enhancement-worthy information
-    facts_text = ""
-
-    if stored_facts.get("situation"):
-        facts_text += f"Situation/Context: {stored_facts['situation']}\n"
-
-    if stored_facts.get("actions"):
-        actions = stored_facts["actions"]
-        if isinstance(actions, list) and actions:
-            facts_text += "Actions Taken:\n"
-            for item in actions:
-                facts_text += f"• {item}\n"
-
-    if stored_facts.get("results"):
-        results = stored_facts["results"]
-        if isinstance(results, list) and results:
-            facts_text += "Results/Achievements:\n"
-            for item in results:
-                facts_text += f"• {item}\n"
-
-    if stored_facts.get("skills"):
-        skills = stored_facts["skills"]
-        if isinstance(skills, list) and skills:
-            facts_text += f"Skills: {', '.join(skills)}\n"
-
-    if stored_facts.get("tools"):
-        tools = stored_facts["tools"]
-        if isinstance(tools, list) and tools:
-            facts_text += f"Tools/Technologies: {', '.join(tools)}\n"
-
-    if stored_facts.get("timeline"):
-        facts_text += f"Timeline: {stored_facts['timeline']}\n"
+    facts_text = _format_facts_detailed(stored_facts)
 
     char_text = f"\nIMPORTANT: Keep the bullet under {char_limit} characters." if char_limit else ""
 
@@ -14,11 +14,31 @@ Usage:
     # This will suggest improvements for WITH-FACTS and NO-FACTS prompts
 """
 
+import os
+import re
 import json
+import hashlib
 import sys
 import argparse
+import asyncio
+import heapq
+import functools
+from collections import Counter
+from itertools import chain
+from pathlib import Path
 from typing import Dict, List, Any
-from config import client, CHAT_MODEL, log
+from json_utils import loads
+from config import client, async_client, CHAT_MODEL, PROMPT_OPT_CACHE_DIR, PROMPT_CACHE_MIN_TOKENS, log
+
+LLM_UTILS_PATH = Path(__file__).with_name('llm_utils.py')
+
+SUGGESTION_CACHE_DIR = Path(PROMPT_OPT_CACHE_DIR) if PROMPT_OPT_CACHE_DIR else None
+
+# prompt type -> (enclosing function definition, prompt opener); the prompt runs to the next closing triple quote
+PROMPT_MARKERS = {
+    'with_facts': (b'def generate_bullet_with_facts(', b'prompt = f"""'),
+    'no_facts': (b'def _generate_bullet_without_facts(', b'prompt = f"""'),
+}
 
 
 def analyze_results(results_data: Dict) -> Dict[str, Any]:
@@ -26,90 +46,110 @@ def analyze_results(results_data: Dict) -> Dict[str, Any]:
 
     results = results_data['results']
 
-    # Separate by context type
-    with_context = [r for r in results if r['has_context']]
-    without_context = [r for r in results if not r['has_context']]
-
-    # Find common issues
-    all_issues = []
-    for r in results:
-        all_issues.extend(r['scores'].get('issues', []))
-
     # Count issue frequency
-    issue_counts = {}
-    for issue in all_issues:
-        issue_counts[issue] = issue_counts.get(issue, 0) + 1
+    issue_counts = Counter(chain.from_iterable(r['scores'].get('issues') or () for r in results))
 
-    # Dimension weaknesses
+    # Single pass: split by context type, running totals per dimension and per context
     dimensions = ['relevance', 'conciseness', 'impact', 'action_verbs', 'factual_accuracy', 'keyword_alignment']
-    dim_scores = {d: [] for d in dimensions}
+    dim_totals = dict.fromkeys(dimensions, 0.0)
+    n_with = n_without = 0
+    total_with = total_without = 0.0
 
     for r in results:
+        scores = r['scores']
         for dim in dimensions:
-            dim_scores[dim].append(r['scores'].get(dim, 0))
+            dim_totals[dim] += scores.get(dim, 0)
+        if r['has_context']:
+            n_with += 1
+            total_with += scores.get('total', 0)
+        else:
+            n_without += 1
+            total_without += scores.get('total', 0)
 
-    dim_averages = {d: sum(scores) / len(scores) if scores else 0 for d, scores in dim_scores.items()}
+    dim_averages = {d: dim_totals[d] / len(results) if results else 0 for d in dimensions}
 
     # Identify lowest performing dimensions (< 6.5)
     weak_dimensions = {d: score for d, score in dim_averages.items() if score < 6.5}
 
+    # Only the 3 worst low-scoring examples per context type are used downstream; don't keep full partitions
+    total_of = lambda r: r['scores'].get('total', 0)
+    low_with = heapq.nsmallest(3, (r for r in results if r['has_context'] and total_of(r) < 6.5), key=total_of)
+    low_without = heapq.nsmallest(3, (r for r in results if not r['has_context'] and total_of(r) < 6.5), key=total_of)
+
     return {
         'total_tests': len(results),
-        'avg_score_with_context': sum(r['scores'].get('total', 0) for r in with_context) / len(with_context) if with_context else 0,
-        'avg_score_without_context': sum(r['scores'].get('total', 0) for r in without_context) / len(without_context) if without_context else 0,
-        'common_issues': sorted(issue_counts.items(), key=lambda x: x[1], reverse=True)[:10],
+        'avg_score_with_context': total_with / n_with if n_with else 0,
+        'avg_score_without_context': total_without / n_without if n_without else 0,
+        'common_issues': issue_counts.most_common(10),
         'weak_dimensions': weak_dimensions,
         'dimension_averages': dim_averages,
-        'worst_cases': sorted(results, key=lambda x: x['scores'].get('total', 0))[:5],
-        'with_context_results': with_context,
-        'without_context_results': without_context
+        'worst_cases': heapq.nsmallest(5, results, key=total_of),
+        'low_scoring_with_context': low_with,
+        'low_scoring_without_context': low_without
     }
 
 
-def get_current_prompts() -> Dict[str, str]:
-    """Extract current prompts from llm_utils.py"""
+def _suggestion_key(prompt_type: str, current_prompt: str, analysis: Dict[str, Any]) -> str:
+    canonical = json.dumps(analysis, sort_keys=True, default=str)
+    return hashlib.sha256(f"{CHAT_MODEL}\x00{prompt_type}\x00{current_prompt}\x00{canonical}".encode('utf-8')).hexdigest()
 
-    # Read the file
-    with open('llm_utils.py', 'r') as f:
-        content = f.read()
 
-    # Extract WITH-FACTS prompt (between specific markers)
-    with_facts_start = content.find('prompt = f"""You are a professional resume writer creating a new, optimized bullet point.')
-    with_facts_end = content.find('Return ONLY the new bullet."""', with_facts_start)
+def _cached_suggestion(key: str) -> str:
+    if SUGGESTION_CACHE_DIR is None:
+        return ""
+    path = SUGGESTION_CACHE_DIR / f"{key}.txt"
+    if path.exists():
+        log.info(f"Suggestion cache hit: {path.name}")
+        return path.read_text(encoding='utf-8')
+    return ""
 
-    # Extract NO-FACTS prompt
-    no_facts_start = content.find('prompt = f"""You are a professional resume writer. Optimize this bullet')
-    no_facts_end = content.find('Return ONLY the optimized bullet text. No explanations, no commentary."""', no_facts_start)
 
-    with_facts_prompt = content[with_facts_start:with_facts_end + len('Return ONLY the new bullet."""')] if with_facts_start != -1 else "NOT FOUND"
-    no_facts_prompt = content[no_facts_start:no_facts_end + len('Return ONLY the optimized bullet text. No explanations, no commentary."""')] if no_facts_start != -1 else "NOT FOUND"
+def _store_suggestion(key: str, text: str) -> None:
+    if SUGGESTION_CACHE_DIR is None or not text or text.startswith("ERROR:"):
+        return
+    try:
+        SUGGESTION_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = SUGGESTION_CACHE_DIR / f"{key}.tmp"
+        tmp.write_text(text, encoding='utf-8')
+        os.replace(tmp, SUGGESTION_CACHE_DIR / f"{key}.txt")
+    except OSError as e:
+        log.warning(f"Could not write suggestion cache: {e}")
 
-    return {
-        'with_facts': with_facts_prompt,
-        'no_facts': no_facts_prompt
-    }
 
+@functools.lru_cache(maxsize=1)
+def _load_prompts(mtime: float) -> Dict[str, str]:
+    """Slice the prompts out of llm_utils.py; cached until the file's mtime changes."""
+    content = LLM_UTILS_PATH.read_bytes()
 
-def llm_suggest_improvements(
-    prompt_type: str,  # "with_facts" or "no_facts"
-    current_prompt: str,
-    analysis: Dict[str, Any]
-) -> str:
-    """Use LLM to suggest prompt improvements based on evaluation analysis."""
+    prompts = {}
+    for prompt_type, (func_marker, opener) in PROMPT_MARKERS.items():
+        func_start = content.find(func_marker)
+        start = content.find(opener, func_start) if func_start != -1 else -1
+        end = content.find(b'"""', start + len(opener)) if start != -1 else -1
+        prompts[prompt_type] = content[start:end + 3].decode('utf-8') if end != -1 else "NOT FOUND"
+    return prompts
+
+
+def get_current_prompts() -> Dict[str, str]:
+    """Extract current prompts from llm_utils.py"""
+    return _load_prompts(os.path.getmtime(LLM_UTILS_PATH))
+
+
+def _task_context(prompt_type: str, current_prompt: str, analysis: Dict[str, Any]) -> str:
+    """Per-prompt-type evaluation context: score, weaknesses, issues, example failures, current prompt."""
 
     if prompt_type == "with_facts":
         context = "WITH-FACTS path (uses stored context about accomplishments)"
-        relevant_results = analysis['with_context_results']
+        low_scoring = analysis['low_scoring_with_context']
         avg_score = analysis['avg_score_with_context']
     else:
         context = "NO-FACTS path (conservative optimization without context - must avoid hallucination)"
-        relevant_results = analysis['without_context_results']
+        low_scoring = analysis['low_scoring_without_context']
         avg_score = analysis['avg_score_without_context']
 
     # Get specific examples of issues
-    low_scoring = [r for r in relevant_results if r['scores'].get('total', 0) < 6.5]
     example_issues = []
-    for r in low_scoring[:3]:
+    for r in low_scoring:
         example_issues.append({
             'original': r['original'],
             'optimized': r['optimized'],
@@ -117,49 +157,53 @@ def llm_suggest_improvements(
             'issues': r['scores'].get('issues', [])
         })
 
-    system_prompt = f"""You are an expert prompt engineer. Your task is to improve a resume bullet optimization prompt based on evaluation results.
-
-CONTEXT: This is the {context}
+    parts = [f"""CONTEXT: This is the {context}
 CURRENT AVERAGE SCORE: {avg_score:.1f}/10
 
 IDENTIFIED WEAKNESSES:
-"""
+"""]
 
     # Add weak dimensions
-    for dim, score in analysis['weak_dimensions'].items():
-        system_prompt += f"- {dim}: {score:.1f}/10 (needs improvement)\n"
+    parts.extend(f"- {dim}: {score:.1f}/10 (needs improvement)\n" for dim, score in analysis['weak_dimensions'].items())
 
     # Add common issues
-    system_prompt += "\nMOST COMMON ISSUES:\n"
-    for issue, count in analysis['common_issues'][:5]:
-        system_prompt += f"- {issue} (occurred {count} times)\n"
+    parts.append("\nMOST COMMON ISSUES:\n")
+    parts.extend(f"- {issue} (occurred {count} times)\n" for issue, count in analysis['common_issues'][:5])
 
     # Add examples
     if example_issues:
-        system_prompt += "\nEXAMPLE FAILURES:\n"
+        parts.append("\nEXAMPLE FAILURES:\n")
         for ex in example_issues:
-            system_prompt += f"\nScore: {ex['score']}/10\n"
-            system_prompt += f"Original: {ex['original']}\n"
-            system_prompt += f"Optimized: {ex['optimized']}\n"
-            system_prompt += f"Issues: {', '.join(ex['issues'])}\n"
+            parts.append(f"\nScore: {ex['score']}/10\n"
+                         f"Original: {ex['original']}\n"
+                         f"Optimized: {ex['optimized']}\n"
+                         f"Issues: {', '.join(ex['issues'] or [])}\n")
 
-    system_prompt += f"""
+    parts.append(f"""
 
 CURRENT PROMPT:
 {current_prompt}
+""")
+    return "".join(parts)
 
----
-
-YOUR TASK:
-Analyze the current prompt and suggest specific improvements to address the identified weaknesses.
 
-GUIDELINES:
+# Static instructions go in a system block (cache_control once long enough) ahead of the per-run context
+# (weaknesses, examples, current prompt), which is sent as the user message.
+GUIDELINES = """GUIDELINES:
 1. Keep the overall structure and key principles
 2. Add specific, actionable guidance to fix the weak dimensions
 3. Include concrete examples where helpful
 4. Make instructions more precise and harder to misinterpret
 5. For NO-FACTS: strengthen anti-hallucination language
-6. For WITH-FACTS: improve conciseness and ending strength
+6. For WITH-FACTS: improve conciseness and ending strength"""
+
+STATIC_HEADER = f"""You are an expert prompt engineer. Your task is to improve a resume bullet optimization prompt based on evaluation results.
+The user message gives the evaluation context and the current prompt.
+
+YOUR TASK:
+Analyze the current prompt and suggest specific improvements to address the identified weaknesses.
+
+{GUIDELINES}
 
 RETURN FORMAT:
 Provide the improved prompt in full, ready to be copy-pasted into the code.
@@ -179,26 +223,179 @@ Key changes made:
 </EXPLANATION>
 """
 
+BATCH_STATIC_HEADER = f"""You are an expert prompt engineer. Your task is to improve several resume bullet optimization prompts based on evaluation results.
+The user message holds one <TASK id="..."> block per prompt, each with its evaluation context and current prompt.
+Each task is independent; handle each one separately.
+
+YOUR TASK:
+For EACH task, analyze its current prompt and suggest specific improvements to address its identified weaknesses.
+
+{GUIDELINES}
+
+RETURN FORMAT:
+For each task, provide the improved prompt in full, ready to be copy-pasted into the code,
+and a brief explanation of key changes made.
+
+Format your response as, for each task id:
+
+<IMPROVED_PROMPT id="task_id">
+[full improved prompt here]
+</IMPROVED_PROMPT>
+
+<EXPLANATION id="task_id">
+Key changes made:
+1. [change 1]
+2. [change 2]
+3. [change 3]
+</EXPLANATION>
+"""
+
+IMPROVED_RE = re.compile(r'<IMPROVED_PROMPT id="(\w+)">(.*?)</IMPROVED_PROMPT>', re.S)
+EXPLANATION_RE = re.compile(r'<EXPLANATION id="(\w+)">(.*?)</EXPLANATION>', re.S)
+
+
+def _cached_system(header: str) -> List[Dict[str, Any]]:
+    """System block for header; cache_control only when it is long enough (~3.5 chars/token) to be cached."""
+    block = {"type": "text", "text": header}
+    if len(header) / 3.5 >= PROMPT_CACHE_MIN_TOKENS:
+        block["cache_control"] = {"type": "ephemeral"}
+    return [block]
+
+
+def llm_suggest_improvements(
+    prompt_type: str,  # "with_facts" or "no_facts"
+    current_prompt: str,
+    analysis: Dict[str, Any]
+) -> str:
+    """Use LLM to suggest prompt improvements based on evaluation analysis."""
+
+    key = _suggestion_key(prompt_type, current_prompt, analysis)
+    cached = _cached_suggestion(key)
+    if cached:
+        return cached
+
     try:
         r = client.messages.create(
             model=CHAT_MODEL,
             max_tokens=4096,
-            messages=[{"role": "user", "content": system_prompt}],
+            system=_cached_system(STATIC_HEADER),
+            messages=[{"role": "user", "content": _task_context(prompt_type, current_prompt, analysis)}],
             temperature=0.3  # Slight creativity for improvements
         )
 
-        return (r.content[0].text or "").strip()
+        text = (r.content[0].text or "").strip()
+        _store_suggestion(key, text)
+        return text
 
     except Exception as e:
         log.exception(f"Error getting LLM suggestions: {e}")
         return f"ERROR: {str(e)}"
 
 
+async def llm_suggest_improvements_async(
+    prompt_type: str,
+    current_prompt: str,
+    analysis: Dict[str, Any]
+) -> str:
+    """Async version of llm_suggest_improvements for concurrent per-type calls."""
+
+    key = _suggestion_key(prompt_type, current_prompt, analysis)
+    cached = _cached_suggestion(key)
+    if cached:
+        return cached
+
+    try:
+        r = await async_client.messages.create(
+            model=CHAT_MODEL,
+            max_tokens=4096,
+            system=_cached_system(STATIC_HEADER),
+            messages=[{"role": "user", "content": _task_context(prompt_type, current_prompt, analysis)}],
+            temperature=0.3  # Slight creativity for improvements
+        )
+
+        text = (r.content[0].text or "").strip()
+        _store_suggestion(key, text)
+        return text
+
+    except Exception as e:
+        log.exception(f"Error getting LLM suggestions: {e}")
+        return f"ERROR: {str(e)}"
+
+
+def suggest_improvements_concurrently(
+    prompt_types: List[str],
+    current_prompts: Dict[str, str],
+    analysis: Dict[str, Any]
+) -> Dict[str, str]:
+    """One llm_suggest_improvements call per prompt type, issued concurrently."""
+
+    if not async_client or len(prompt_types) < 2:
+        return {pt: llm_suggest_improvements(pt, current_prompts[pt], analysis) for pt in prompt_types}
+
+    async def run():
+        return await asyncio.gather(*[
+            llm_suggest_improvements_async(pt, current_prompts[pt], analysis) for pt in prompt_types
+        ])
+
+    return dict(zip(prompt_types, asyncio.run(run())))
+
+
+def llm_suggest_improvements_batch(
+    prompt_types: List[str],
+    current_prompts: Dict[str, str],
+    analysis: Dict[str, Any]
+) -> Dict[str, str]:
+    """
+    Improve several prompt types in one LLM call: each type is a labeled <TASK> block and
+    the response carries one <IMPROVED_PROMPT id=...> / <EXPLANATION id=...> pair per task.
+    Tasks missing from the response fall back to a separate llm_suggest_improvements call.
+    """
+
+    tasks = "\n".join(
+        f'<TASK id="{pt}">\n{_task_context(pt, current_prompts[pt], analysis)}</TASK>\n'
+        for pt in prompt_types
+    )
+
+    key = _suggestion_key(",".join(prompt_types), "\x00".join(current_prompts[pt] for pt in prompt_types), analysis)
+    raw = _cached_suggestion(key)
+    if not raw:
+        try:
+            r = client.messages.create(
+                model=CHAT_MODEL,
+                max_tokens=4096 * len(prompt_types),
+                system=_cached_system(BATCH_STATIC_HEADER),
+                messages=[{"role": "user", "content": tasks}],
+                temperature=0.3  # Slight creativity for improvements
+            )
+            raw = (r.content[0].text or "").strip()
+        except Exception as e:
+            log.exception(f"Error getting batched LLM suggestions: {e}")
+
+    improved = dict(IMPROVED_RE.findall(raw))
+    explanations = dict(EXPLANATION_RE.findall(raw))
+    if all(pt in improved for pt in prompt_types):
+        _store_suggestion(key, raw)
+
+    suggestions = {}
+    for pt in prompt_types:
+        if pt in improved:
+            suggestions[pt] = (f"<IMPROVED_PROMPT>\n{improved[pt].strip()}\n</IMPROVED_PROMPT>\n\n"
+                               f"<EXPLANATION>\n{explanations.get(pt, '').strip()}\n</EXPLANATION>")
+
+    missing = [pt for pt in prompt_types if pt not in suggestions]
+    if missing:
+        log.warning(f"Batched response missing {', '.join(missing)}, requesting separately")
+        suggestions.update(suggest_improvements_concurrently(missing, current_prompts, analysis))
+    return {pt: suggestions[pt] for pt in prompt_types}
+
+
 def main():
     parser = argparse.ArgumentParser(description='Optimize prompts based on evaluation results')
     parser.add_argument('results_file', help='Path to evaluation results JSON')
     parser.add_argument('--prompt-type', choices=['with_facts', 'no_facts', 'both'], default='both',
                         help='Which prompt to optimize')
+    parser.add_argument('--no-batch', action='store_true',
+                        help='One (concurrent) LLM call per prompt type instead of a single batched call')
 
     args = parser.parse_args()
 
@@ -207,8 +404,8 @@ def main():
     print(f"{'='*80}\n")
 
     # Load evaluation results
-    with open(args.results_file, 'r') as f:
-        results_data = json.load(f)
+    with open(args.results_file, 'rb') as f:
+        results_data = loads(f.read())
 
     print(f"Loaded {results_data['total_tests']} test results from {args.results_file}\n")
 
@@ -235,18 +432,18 @@ def main():
     # Generate suggestions
     prompt_types = ['with_facts', 'no_facts'] if args.prompt_type == 'both' else [args.prompt_type]
 
+    print(f"\nAsking LLM for improvement suggestions ({', '.join(prompt_types)})...")
+    if len(prompt_types) > 1 and not args.no_batch:
+        all_suggestions = llm_suggest_improvements_batch(prompt_types, current_prompts, analysis)
+    else:
+        all_suggestions = suggest_improvements_concurrently(prompt_types, current_prompts, analysis)
+
     for prompt_type in prompt_types:
         print(f"\n{'='*80}")
         print(f"OPTIMIZING: {prompt_type.upper().replace('_', '-')} PROMPT")
         print(f"{'='*80}\n")
 
-        print("Asking LLM for improvement suggestions...")
-
-        suggestions = llm_suggest_improvements(
-            prompt_type,
-            current_prompts[prompt_type],
-            analysis
-        )
+        suggestions = all_suggestions[prompt_type]
 
         # Save suggestions to file
         output_file = f"prompt_suggestions_{prompt_type}.txt"
@@ -1,18 +1,35 @@
-from typing import Dict
+from typing import Dict, List, Optional
+import numpy as np
 from config import USE_DISTILLED_JD, W_DISTILLED, W_EMB, W_KEY, W_LLM
-from llm_utils import embed, llm_fit_score, llm_distill_jd, llm_extract_terms
+from llm_utils import embed_many, llm_fit_score, llm_distill_jd, llm_extract_terms
 from text_utils import keyword_coverage, weighted_keyword_coverage
 
+def _vec(v) -> np.ndarray:
+    return np.asarray(v, dtype=np.float32)
+
 def cosine(a, b):
-    if not a or not b: return 0.0
-    s = sum(x*y for x, y in zip(a, b))
-    na = sum(x*x for x in a) ** 0.5
-    nb = sum(y*y for y in b) ** 0.5
-    if na == 0 or nb == 0: return 0.0
-    return s / (na * nb)
+    a, b = _vec(a), _vec(b)
+    if not a.size or not b.size: return 0.0
+    denom = float(np.sqrt(np.vdot(a, a) * np.vdot(b, b)))
+    if denom == 0.0: return 0.0
+    return float(np.dot(a, b)) / denom
+
+def _normalize(v) -> np.ndarray:
+    """L2-normalize once so similarities reduce to a plain dot product; empty/zero vectors stay zero."""
+    v = _vec(v)
+    return v / max(float(np.linalg.norm(v)), 1e-12) if v.size else v
+
+def _normalize_rows(vecs: List) -> np.ndarray:
+    M = np.vstack([_vec(v) for v in vecs]) if vecs else np.zeros((0, 0), dtype=np.float32)
+    norms = np.linalg.norm(M, axis=1, keepdims=True)
+    M /= np.maximum(norms, 1e-12)
+    return M
+
+def _dot(a_hat: np.ndarray, b_hat: np.ndarray) -> float:
+    if not a_hat.size or not b_hat.size: return 0.0
+    return float(np.dot(a_hat, b_hat))
 
 def composite_score(resume_text: str, jd_text: str) -> Dict:
-    jd_for_terms = jd_text
     jd_for_embed = jd_text
     if USE_DISTILLED_JD:
         distilled = llm_distill_jd(jd_text)
@@ -20,16 +37,22 @@ def composite_score(resume_text: str, jd_text: str) -> Dict:
     else:
         distilled = None
 
-    emb_r = embed(resume_text)
-    emb_j_dist = embed(jd_for_embed)
-    sim_dist = cosine(emb_r, emb_j_dist)
-    sim_orig = cosine(emb_r, embed(jd_text)) if USE_DISTILLED_JD else sim_dist
+    # One embeddings request for resume + JD(s); normalize once, the resume vector is reused for both comparisons
+    texts = [resume_text, jd_for_embed] + ([jd_text] if USE_DISTILLED_JD else [])
+    vecs = [_normalize(v) for v in embed_many(texts)]
+    emb_r, emb_j_dist = vecs[0], vecs[1]
+    sim_dist = _dot(emb_r, emb_j_dist)
+    sim_orig = _dot(emb_r, vecs[2]) if USE_DISTILLED_JD else sim_dist
     semantic = W_DISTILLED * sim_dist + (1.0 - W_DISTILLED) * sim_orig
+    return _finish(resume_text, jd_text, distilled, semantic)
 
+def _finish(resume_text: str, jd_text: str, distilled, semantic: float, res_lower: Optional[str] = None) -> Dict:
+    """Keyword + LLM components and the weighted composite, given the semantic similarity."""
+    jd_for_terms = jd_text
     if distilled is not None:
         jd_for_terms = distilled
         terms = llm_extract_terms(jd_for_terms)
-        key = weighted_keyword_coverage(resume_text, terms)
+        key = weighted_keyword_coverage(resume_text, terms, res_lower=res_lower)
     else:
         key = keyword_coverage(resume_text, jd_text)
 
@@ -42,4 +65,24 @@ def composite_score(resume_text: str, jd_text: str) -> Dict:
         "composite": round(score*100.0, 1),
         "distilled_used": bool(distilled is not None),
         "llm_terms_used": bool(distilled is not None),
-    }
\ No newline at end of file
+    }
+
+def score_many(resume_text: str, jd_texts: List[str]) -> List[Dict]:
+    """
+    composite_score for one resume against many JDs. All texts are embedded in one request and the
+    JD vectors are stacked into an (N, D) matrix, so the semantic similarities are a single M @ r.
+    """
+    if not jd_texts: return []
+    distilled = [llm_distill_jd(j) for j in jd_texts] if USE_DISTILLED_JD else [None] * len(jd_texts)
+    n = len(jd_texts)
+    jd_for_embed = distilled if USE_DISTILLED_JD else jd_texts
+    vecs = embed_many([resume_text] + jd_for_embed + (jd_texts if USE_DISTILLED_JD else []))
+    r_hat = _normalize(vecs[0])
+    if not r_hat.size:
+        sims_dist = sims_orig = np.zeros(n, dtype=np.float32)
+    else:
+        sims_dist = _normalize_rows(vecs[1:1 + n]) @ r_hat
+        sims_orig = _normalize_rows(vecs[1 + n:]) @ r_hat if USE_DISTILLED_JD else sims_dist
+    semantic = W_DISTILLED * sims_dist + (1.0 - W_DISTILLED) * sims_orig
+    res_lower = resume_text.lower()  # shared by every JD's keyword coverage
+    return [_finish(resume_text, jd, d, float(sem), res_lower) for jd, d, sem in zip(jd_texts, distilled, semantic)]
@@ -1,12 +1,13 @@
 #!/usr/bin/env python3
 """Summarize keyword optimization test results."""
 
-import json
 from typing import Dict, List
+from json_utils import loads
+import numpy as np
 
 def load_results(filename: str) -> Dict:
-    with open(filename, 'r') as f:
-        return json.load(f)
+    with open(filename, 'rb') as f:
+        return loads(f.read())
 
 def summarize_approach(approach_name: str, results: List[Dict]) -> Dict:
     """Calculate summary stats for an approach."""
@@ -15,17 +16,18 @@ def summarize_approach(approach_name: str, results: List[Dict]) -> Dict:
     if not valid:
         return None
 
-    avg_baseline = sum(r['baseline_keyword_score'] for r in valid) / len(valid)
-    avg_optimized = sum(r['optimized_scores']['keyword_alignment'] for r in valid) / len(valid)
-    avg_delta = sum(r['keyword_delta'] for r in valid) / len(valid)
-    avg_factual = sum(r['optimized_scores']['factual_preservation'] for r in valid) / len(valid)
-    avg_natural = sum(r['optimized_scores']['natural_flow'] for r in valid) / len(valid)
-    avg_total = sum(r['optimized_scores']['total'] for r in valid) / len(valid)
+    # One (n, 6) matrix, one column reduction instead of six Python passes
+    data = np.array([[r['baseline_keyword_score'],
+                      r['optimized_scores']['keyword_alignment'],
+                      r['keyword_delta'],
+                      r['optimized_scores']['factual_preservation'],
+                      r['optimized_scores']['natural_flow'],
+                      r['optimized_scores']['total']] for r in valid], dtype=np.float64)
+    avg_baseline, avg_optimized, avg_delta, avg_factual, avg_natural, avg_total = data.mean(axis=0).tolist()
 
-    improvements = sum(1 for r in valid if r['keyword_delta'] > 0)
-    pct_improved = improvements / len(valid) * 100
+    pct_improved = float((data[:, 2] > 0).mean()) * 100
 
-    high_factual = sum(1 for r in valid if r['optimized_scores']['factual_preservation'] >= 8)
+    high_factual = int((data[:, 3] >= 8).sum())
     pct_high_factual = high_factual / len(valid) * 100
 
     return {
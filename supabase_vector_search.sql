@@ -0,0 +1,52 @@
+-- Vector search for user_bullets (run after supabase_schema.sql).
+--
+-- Backs db_utils_optimized.find_similar_bullets_rpc: similarity is computed in
+-- Postgres instead of fetching every bullet embedding into Python.
+--
+-- Requires pgvector >= 0.8 (hnsw.iterative_scan). supabase_schema.sql is not in
+-- this repo; the signatures below assume user_bullets.id is uuid, user_id is
+-- text and bullet_embedding is vector(1536). Adjust them if the schema differs.
+
+-- Per-user filter. The planner may use it for an exact scan over one user's rows,
+-- but it can still pick the HNSW index for ORDER BY ... LIMIT. A plain HNSW scan
+-- returns ef_search candidates across all users before the user_id filter, so
+-- the search functions enable iterative scans to keep recall for each user.
+create index if not exists user_bullets_user_id_idx
+    on user_bullets (user_id);
+
+-- Approximate nearest-neighbour index for cosine distance (pgvector >= 0.5)
+create index if not exists user_bullets_embedding_hnsw_idx
+    on user_bullets using hnsw (bullet_embedding vector_cosine_ops)
+    with (m = 16, ef_construction = 64);
+
+create or replace function find_similar_bullets(
+    p_user_id text,
+    p_embedding vector(1536),
+    p_threshold float default 0.85,
+    p_limit int default 5
+)
+returns table (bullet_id uuid, bullet_text text, similarity_score float)
+language sql stable
+set hnsw.ef_search = 40
+set hnsw.iterative_scan = relaxed_order
+as $$
+    -- The inner ORDER BY must be the bare `<=>` expression or the HNSW index is
+    -- skipped. The distance is computed once there and the threshold is applied
+    -- outside, so the nearest p_limit rows are found first and then filtered.
+    -- relaxed_order keeps scanning until p_limit rows of this user are found; the
+    -- outer ORDER BY restores exact ordering.
+    select s.id, s.bullet_text, 1 - s.distance
+    from (
+        select b.id, b.bullet_text, b.bullet_embedding <=> p_embedding as distance
+        from user_bullets b
+        where b.user_id = p_user_id
+          and b.bullet_embedding is not null
+        order by b.bullet_embedding <=> p_embedding
+        limit p_limit
+    ) s
+    where s.distance <= 1 - p_threshold
+    order by s.distance;
+$$;
+
+-- Refresh planner statistics so per-user selectivity is estimated from current data
+analyze user_bullets;
@@ -0,0 +1,42 @@
+-- Optional inner-product search for user_bullets (run after supabase_vector_search.sql).
+--
+-- Apply this only when USE_INNER_PRODUCT_SEARCH=1: find_similar_bullets_ip needs its
+-- own vector_ip_ops HNSW index, which would otherwise double the index build time
+-- and the write cost of every user_bullets insert for a function nobody calls.
+-- After switching back to cosine, drop it with:
+--   drop function if exists find_similar_bullets_ip; drop index if exists user_bullets_embedding_hnsw_ip_idx;
+--
+-- Requires pgvector >= 0.8 and the same column types as supabase_vector_search.sql.
+
+-- The app stores and queries
+-- unit-length embeddings, so -(a <#> b) equals cosine similarity and no per-row
+-- norms are needed. Rows stored before normalization can be backfilled once with:
+--   update user_bullets set bullet_embedding = l2_normalize(bullet_embedding);
+create index if not exists user_bullets_embedding_hnsw_ip_idx
+    on user_bullets using hnsw (bullet_embedding vector_ip_ops)
+    with (m = 16, ef_construction = 64);
+
+create or replace function find_similar_bullets_ip(
+    p_user_id text,
+    p_embedding vector(1536),
+    p_threshold float default 0.85,
+    p_limit int default 5
+)
+returns table (bullet_id uuid, bullet_text text, similarity_score float)
+language sql stable
+set hnsw.ef_search = 40
+set hnsw.iterative_scan = relaxed_order
+as $$
+    -- <#> is the negative inner product, so ascending order is most similar first
+    select s.id, s.bullet_text, s.similarity
+    from (
+        select b.id, b.bullet_text, -(b.bullet_embedding <#> p_embedding) as similarity
+        from user_bullets b
+        where b.user_id = p_user_id
+          and b.bullet_embedding is not null
+        order by b.bullet_embedding <#> p_embedding
+        limit p_limit
+    ) s
+    where s.similarity >= p_threshold
+    order by s.similarity desc;
+$$;
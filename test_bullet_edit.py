@@ -11,11 +11,17 @@ This tests that:
 
 import requests
 import json
+from requests.adapters import HTTPAdapter
 
 # Test configuration
 BASE_URL = "http://localhost:8000"
 ENDPOINT = "/v2/bullets/edit"
 
+# One keep-alive session for all tests instead of a new connection per request
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=10, pool_maxsize=10))
+SESSION.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=10))
+
 def test_bullet_edit_within_limit():
     """Test editing a bullet that stays within character limit."""
 
@@ -37,7 +43,7 @@ def test_bullet_edit_within_limit():
 
     # Make request
     try:
-        response = requests.post(
+        response = SESSION.post(
             url,
             json=test_request,
             headers={"Content-Type": "application/json"},
@@ -118,7 +124,7 @@ def test_bullet_edit_exceeds_limit():
 
     # Make request
     try:
-        response = requests.post(
+        response = SESSION.post(
             url,
             json=test_request,
             headers={"Content-Type": "application/json"},
@@ -187,7 +193,7 @@ def test_bullet_edit_no_original():
 
     # Make request
     try:
-        response = requests.post(
+        response = SESSION.post(
             url,
             json=test_request,
             headers={"Content-Type": "application/json"},
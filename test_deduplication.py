@@ -3,8 +3,18 @@
 Test the deduplication functionality to verify it removes repetitive vocabulary.
 """
 
+import re
+from collections import Counter
 from llm_utils import optimize_keywords_light_touch, deduplicate_repeated_words
 
+repetitive_words = ["generate", "generated", "develop", "developed", "create", "created", "build", "built", "conduct", "conducted"]
+# One pass over the text for all words; \b keeps "generate" from also counting "generated"
+REPEAT_RE = re.compile(r"\b(" + "|".join(repetitive_words) + r")\b", re.I)
+
+def find_repetitions(text: str) -> list:
+    counts = Counter(m.group(1).lower() for m in REPEAT_RE.finditer(text))
+    return [f"{word}: {counts[word]} times" for word in repetitive_words if counts[word] > 1]
+
 # Test data with job description that might cause repetition
 job_description = """
 Senior Data Analyst position requiring:
@@ -45,14 +55,7 @@ print()
 # Check for repetition
 print("CHECKING FOR REPETITION:")
 print("-" * 80)
-all_text = " ".join(optimized_individually).lower()
-repetitive_words = ["generate", "generated", "develop", "developed", "create", "created", "build", "built", "conduct", "conducted"]
-
-found_repetitions = []
-for word in repetitive_words:
-    count = all_text.count(word)
-    if count > 1:
-        found_repetitions.append(f"{word}: {count} times")
+found_repetitions = find_repetitions(" ".join(optimized_individually))
 
 if found_repetitions:
     print("⚠️  REPETITION DETECTED:")
@@ -76,13 +79,7 @@ print()
 # Check for improvement
 print("AFTER DEDUPLICATION:")
 print("-" * 80)
-all_text_after = " ".join(deduplicated).lower()
-
-found_repetitions_after = []
-for word in repetitive_words:
-    count = all_text_after.count(word)
-    if count > 1:
-        found_repetitions_after.append(f"{word}: {count} times")
+found_repetitions_after = find_repetitions(" ".join(deduplicated))
 
 if found_repetitions_after:
     print("⚠️  Still some repetition:")
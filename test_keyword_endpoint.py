@@ -9,12 +9,24 @@ This tests that:
 4. The optimization is conservative (high factual accuracy)
 """
 
+import re
 import requests
 import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from json_utils import dumps as _dumps, loads as _loads  # bytes in/out
 
 # Test configuration
 BASE_URL = "http://localhost:8000"
 ENDPOINT = "/v2/apply/generate_keywords_only"
+MAX_WORKERS = 8  # concurrent requests; the server bounds its own LLM fan-out
+_DIGIT_RE = re.compile(r"\d+")
+
+# Keep-alive session reused across runs; retries only cover connection setup (POST is not re-sent)
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=Retry(total=2, backoff_factor=0.1)))
+SESSION.headers.update({"Content-Type": "application/json"})
 
 # Test data
 test_request = {
@@ -48,36 +60,28 @@ test_request = {
     ]
 }
 
-def test_keyword_endpoint():
-    """Test the keyword-only optimization endpoint."""
+# Add payloads here to exercise more job descriptions / bullet sets in one run
+PAYLOADS = [test_request]
 
-    print("=" * 80)
-    print("TESTING KEYWORD-ONLY OPTIMIZATION ENDPOINT")
-    print("=" * 80)
-    print()
-
-    url = f"{BASE_URL}{ENDPOINT}"
-    print(f"Endpoint: {url}")
-    print(f"User ID: {test_request['user_id']}")
-    print(f"Number of bullets: {len(test_request['bullets'])}")
-    print()
 
-    # Make request
-    print("Sending request...")
+def _send(body: bytes):
+    """POST one pre-serialized payload; returns the response, or None after printing why it failed."""
     try:
-        response = requests.post(
-            url,
-            json=test_request,
-            headers={"Content-Type": "application/json"},
+        return SESSION.post(
+            f"{BASE_URL}{ENDPOINT}",
+            data=body,
             timeout=120  # 2 minutes for LLM calls
         )
     except requests.exceptions.ConnectionError:
         print("❌ ERROR: Could not connect to server. Is it running?")
         print(f"   Try: cd {'/'.join(__file__.split('/')[:-1])} && uvicorn app:app --reload")
-        return False
     except requests.exceptions.Timeout:
         print("❌ ERROR: Request timed out (>120s)")
-        return False
+    return None
+
+
+def _check_response(payload: dict, response) -> bool:
+    """Validate one endpoint response against the payload that produced it."""
 
     # Check response
     print(f"Status Code: {response.status_code}")
@@ -90,8 +94,8 @@ def test_keyword_endpoint():
 
     # Parse response
     try:
-        result = response.json()
-    except json.JSONDecodeError:
+        result = _loads(response.content)  # parse the raw bytes, no str decode
+    except json.JSONDecodeError:  # orjson.JSONDecodeError subclasses this
         print("❌ FAILED: Invalid JSON response")
         print(f"Response: {response.text}")
         return False
@@ -107,8 +111,8 @@ def test_keyword_endpoint():
     enhanced = result["enhanced_bullets"]
     print(f"✓ Enhanced bullets count: {len(enhanced)}")
 
-    if len(enhanced) != len(test_request["bullets"]):
-        print(f"❌ FAILED: Expected {len(test_request['bullets'])} bullets, got {len(enhanced)}")
+    if len(enhanced) != len(payload["bullets"]):
+        print(f"❌ FAILED: Expected {len(payload['bullets'])} bullets, got {len(enhanced)}")
         return False
 
     # Check each bullet
@@ -117,41 +121,41 @@ def test_keyword_endpoint():
     print("BULLET TRANSFORMATIONS")
     print("=" * 80)
 
+    # Buffer the per-bullet report and write it once
+    out = []
     for i, bullet_result in enumerate(enhanced):
-        print()
-        print(f"--- Bullet {i+1} ---")
+        out.append("")
+        out.append(f"--- Bullet {i+1} ---")
 
         if "original" not in bullet_result or "enhanced" not in bullet_result:
-            print("❌ FAILED: Missing 'original' or 'enhanced' in bullet result")
+            out.append("❌ FAILED: Missing 'original' or 'enhanced' in bullet result")
+            print("\n".join(out))
             return False
 
         original = bullet_result["original"]
         enhanced_text = bullet_result["enhanced"]
         used_facts = bullet_result.get("used_facts", True)  # Should be False
 
-        print(f"Original:  {original}")
-        print(f"Enhanced:  {enhanced_text}")
-        print(f"Used Facts: {used_facts}")
+        out.append(f"Original:  {original}")
+        out.append(f"Enhanced:  {enhanced_text}")
+        out.append(f"Used Facts: {used_facts}")
 
         # Check that used_facts is False (keyword-only mode)
         if used_facts:
-            print("⚠️  WARNING: used_facts should be False for keyword-only mode")
+            out.append("⚠️  WARNING: used_facts should be False for keyword-only mode")
 
         # Check that the bullet was actually modified (or stayed same if perfect)
         if original == enhanced_text:
-            print("ℹ️  Note: Bullet unchanged (may be intentional if already optimal)")
+            out.append("ℹ️  Note: Bullet unchanged (may be intentional if already optimal)")
         else:
-            print("✓ Bullet was optimized")
+            out.append("✓ Bullet was optimized")
 
         # Simple factual check: ensure no obvious hallucinations
         # (e.g., numbers should not appear if not in original)
-        import re
-        original_numbers = set(re.findall(r'\d+', original))
-        enhanced_numbers = set(re.findall(r'\d+', enhanced_text))
-        new_numbers = enhanced_numbers - original_numbers
-
+        new_numbers = set(_DIGIT_RE.findall(enhanced_text)) - set(_DIGIT_RE.findall(original))
         if new_numbers:
-            print(f"⚠️  WARNING: New numbers added: {new_numbers} (possible hallucination)")
+            out.append(f"⚠️  WARNING: New numbers added: {new_numbers} (possible hallucination)")
+    print("\n".join(out))
 
     # Check scores
     print()
@@ -187,6 +191,45 @@ def test_keyword_endpoint():
     return True
 
 
+def test_keyword_endpoint(payloads=None):
+    """Test the keyword-only optimization endpoint; multiple payloads are sent concurrently."""
+    payloads = payloads or PAYLOADS
+
+    print("=" * 80)
+    print("TESTING KEYWORD-ONLY OPTIMIZATION ENDPOINT")
+    print("=" * 80)
+    print()
+
+    print(f"Endpoint: {BASE_URL}{ENDPOINT}")
+    for payload in payloads:
+        print(f"User ID: {payload['user_id']}")
+        print(f"Number of bullets: {len(payload['bullets'])}")
+    print()
+
+    # Serialize each payload once up front; the session's Content-Type header marks it as JSON
+    bodies = [_dumps(payload) for payload in payloads]
+
+    # Warm the pool: open the keep-alive connection with the cheap health route first
+    try:
+        SESSION.get(f"{BASE_URL}/", timeout=5)
+    except requests.exceptions.RequestException:
+        pass  # _send reports connection problems
+
+    # Overlap the requests (wall time is the slowest response, not the sum) and validate
+    # each one as soon as it lands; all threads share SESSION's connection pool
+    print(f"Sending {len(payloads)} request(s)...")
+    results = []
+    with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(payloads))) as pool:
+        futures = {pool.submit(_send, body): payload for body, payload in zip(bodies, payloads)}
+        for future in as_completed(futures):
+            response = future.result()
+            results.append(response is not None and _check_response(futures[future], response))
+    return all(results)
+
+
 if __name__ == "__main__":
-    success = test_keyword_endpoint()
+    try:
+        success = test_keyword_endpoint()
+    finally:
+        SESSION.close()
     exit(0 if success else 1)
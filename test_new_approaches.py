@@ -2,34 +2,30 @@
 """Test the new conservative keyword optimization approaches."""
 
 import csv
-import json
 import re
+from json_utils import loads, dump_pretty
+import asyncio
 from llm_utils import optimize_keywords_synonym_only, optimize_keywords_light_touch, optimize_keywords_one_change
-from config import client, CHAT_MODEL
-
-# Load bullets
-bullets = []
-with open("bullets.csv", "r") as f:
-    reader = csv.DictReader(f)
-    for row in reader:
-        bullets.append({
-            "id": row["id"],
-            "text": row["bullet_text"]
-        })
-
-# Load jobs
-jobs = []
-with open("jobs.csv", "r") as f:
-    reader = csv.DictReader(f)
-    for row in reader:
-        jobs.append({
-            "id": row["id"],
-            "title": row["title"],
-            "desc": row["description"]
-        })
+from config import async_client, CHAT_MODEL
+
+MAX_CONCURRENCY = 8  # (optimize + judge) cases in flight; bounded to stay under provider rate limits
+_JSON_RE = re.compile(r"\{[^}]+\}")
+
+def load_columns(path, *names):
+    """Read the named CSV columns into parallel lists (one list per column, no per-row dicts)."""
+    with open(path, "r", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        idx = [header.index(name) for name in names]
+        rows = list(reader)
+    return [[row[i] for row in rows] for i in idx]
+
+# Load bullets and jobs
+bullet_ids, bullet_texts = load_columns("bullets.csv", "id", "bullet_text")
+job_ids, job_descs = load_columns("jobs.csv", "id", "description")
 
 # LLM Judge for keyword optimization
-def judge_optimization(original, optimized, job_desc):
+async def judge_optimization(original, optimized, job_desc):
     prompt = f"""Score this keyword optimization on two dimensions.
 
 ORIGINAL BULLET:
@@ -57,16 +53,16 @@ Score each dimension 1-10:
 
 Return ONLY valid JSON in this exact format: {{"factual": X, "keyword": Y}}"""
 
-    r = client.messages.create(
+    r = await async_client.messages.create(
         model=CHAT_MODEL,
         max_tokens=100,
         messages=[{"role": "user", "content": prompt}],
         temperature=0
     )
     text = r.content[0].text.strip()
-    match = re.search(r"\{[^}]+\}", text)
+    match = _JSON_RE.search(text)
     if match:
-        return json.loads(match.group())
+        return loads(match.group())
     return {"factual": 5, "keyword": 5}
 
 # Test approaches
@@ -76,57 +72,74 @@ approaches = [
     ("one_change", optimize_keywords_one_change),
 ]
 
-all_results = {}
-
-for approach_name, func in approaches:
-    print()
-    print("=" * 80)
-    print(f"TESTING: {approach_name.upper()}")
-    print("=" * 80)
-
-    results = []
-    test_num = 0
-
-    for bullet in bullets:
-        for job in jobs:
-            test_num += 1
-            try:
-                optimized = func(bullet["text"], job["desc"])
-                scores = judge_optimization(bullet["text"], optimized, job["desc"])
-
-                results.append({
-                    "bullet_id": bullet["id"],
-                    "job_id": job["id"],
-                    "original": bullet["text"],
-                    "optimized": optimized,
-                    "factual": scores["factual"],
-                    "keyword": scores["keyword"]
-                })
-
-                short_id = bullet["id"][:20]
-                print(f"[{test_num}/36] {short_id} -> {job['id']}: F={scores['factual']}/10 K={scores['keyword']}/10")
-
-            except Exception as e:
-                print(f"[{test_num}/36] ERROR: {e}")
-                results.append({
-                    "bullet_id": bullet["id"],
-                    "job_id": job["id"],
-                    "error": str(e)
-                })
-
-    all_results[approach_name] = results
-
-    # Summary
-    valid = [r for r in results if "factual" in r]
-    if valid:
-        avg_factual = sum(r["factual"] for r in valid) / len(valid)
-        avg_keyword = sum(r["keyword"] for r in valid) / len(valid)
-        high_factual = sum(1 for r in valid if r["factual"] >= 8)
-        print(f"\nSUMMARY: Avg Factual={avg_factual:.1f}, Avg Keyword={avg_keyword:.1f}, High Factual (>=8): {high_factual}/{len(valid)}")
+async def run_case(func, bi, ji, slots):
+    """Optimize bullet bi for job ji and judge the result (two LLM calls)."""
+    async with slots:
+        try:
+            # The optimizers are synchronous llm_utils calls; run them off the event loop
+            optimized = await asyncio.to_thread(func, bullet_texts[bi], job_descs[ji])
+            scores = await judge_optimization(bullet_texts[bi], optimized, job_descs[ji])
+            return {
+                "bullet_id": bullet_ids[bi],
+                "job_id": job_ids[ji],
+                "original": bullet_texts[bi],
+                "optimized": optimized,
+                "factual": scores["factual"],
+                "keyword": scores["keyword"]
+            }
+        except Exception as e:
+            return {
+                "bullet_id": bullet_ids[bi],
+                "job_id": job_ids[ji],
+                "error": str(e)
+            }
+
+cases = [(bi, ji) for bi in range(len(bullet_ids)) for ji in range(len(job_ids))]
+total = len(cases)
+
+async def run_approach(func):
+    """All cases for one approach, MAX_CONCURRENCY at a time; results keep the bullet x job order."""
+    slots = asyncio.Semaphore(MAX_CONCURRENCY)
+
+    async def indexed(i, bi, ji):
+        return i, await run_case(func, bi, ji, slots)
+
+    results = [None] * total
+    pending = [indexed(i, bi, ji) for i, (bi, ji) in enumerate(cases)]
+    for test_num, done in enumerate(asyncio.as_completed(pending), 1):
+        i, r = await done
+        results[i] = r
+        if "error" in r:
+            print(f"[{test_num}/{total}] ERROR: {r['error']}")
+        else:
+            short_id = r["bullet_id"][:20]
+            print(f"[{test_num}/{total}] {short_id} -> {r['job_id']}: F={r['factual']}/10 K={r['keyword']}/10")
+    return results
+
+async def main():
+    # One event loop for every approach so the async client's connection pool is reused throughout
+    all_results = {}
+    for approach_name, func in approaches:
+        print()
+        print("=" * 80)
+        print(f"TESTING: {approach_name.upper()}")
+        print("=" * 80)
+
+        results = all_results[approach_name] = await run_approach(func)
+
+        # Summary
+        valid = [r for r in results if "factual" in r]
+        if valid:
+            avg_factual = sum(r["factual"] for r in valid) / len(valid)
+            avg_keyword = sum(r["keyword"] for r in valid) / len(valid)
+            high_factual = sum(1 for r in valid if r["factual"] >= 8)
+            print(f"\nSUMMARY: Avg Factual={avg_factual:.1f}, Avg Keyword={avg_keyword:.1f}, High Factual (>=8): {high_factual}/{len(valid)}")
+    return all_results
+
+all_results = asyncio.run(main())
 
 # Save results
-with open("new_approaches_results.json", "w") as f:
-    json.dump(all_results, f, indent=2)
+dump_pretty(all_results, "new_approaches_results.json")
 
 print()
 print("=" * 80)
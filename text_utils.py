@@ -1,21 +1,27 @@
-import re
+import re, functools
 from collections import Counter
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
 
-STOPWORDS = set("""
+STOPWORDS = frozenset("""
 a an the and or for of to in on at by with from as is are was were be been being
 this that these those such into across over under within without not no nor than
 your you we they he she it their our us
 """.split())
 TOKEN_RE = re.compile(r"[A-Za-z0-9+#\-\.]+")
+_has_alpha = re.compile(r"[A-Za-z]").search  # tokens are ASCII (TOKEN_RE), so this matches str.isalpha per char
 
 def simple_tokens(text: str) -> List[str]:
-    toks = [t.lower() for t in TOKEN_RE.findall(text)]
-    return [t for t in toks if len(t) > 1 and t not in STOPWORDS]
+    # Lowercase the whole text once instead of each token; TOKEN_RE is ASCII-only either way
+    return [t for t in TOKEN_RE.findall(text.lower()) if len(t) > 1 and t not in STOPWORDS]
 
-def keyword_set(text: str) -> set:
-    toks = simple_tokens(text)
-    return set([t for t in toks if any(c.isalpha() for c in t) and len(t) >= 3])
+@functools.lru_cache(maxsize=256)
+def _keyword_tokens(text: str) -> Tuple[str, ...]:
+    # One tokenization per document, shared by keyword_set and top_terms (the same resume/JD is scored repeatedly)
+    return tuple(t for t in simple_tokens(text) if len(t) >= 3 and _has_alpha(t))
+
+@functools.lru_cache(maxsize=256)
+def keyword_set(text: str) -> frozenset:
+    return frozenset(_keyword_tokens(text))
 
 def keyword_coverage(resume_text: str, jd_text: str) -> float:
     rset = keyword_set(resume_text)
@@ -24,9 +30,10 @@ def keyword_coverage(resume_text: str, jd_text: str) -> float:
     hits = len(jset & rset)
     return hits / len(jset)
 
-def weighted_keyword_coverage(resume_text: str, jd_terms: Dict[str, List[str]]) -> float:
+def weighted_keyword_coverage(resume_text: str, jd_terms: Dict[str, List[str]], *, res_lower: Optional[str] = None) -> float:
+    # res_lower: pass resume_text.lower() when scoring one resume against many JDs
     weights = {"tools":3, "skills":2, "responsibilities":2, "domains":2, "certifications":1, "seniority":1}
-    res_lower = resume_text.lower()
+    if res_lower is None: res_lower = resume_text.lower()
     total_weight = 0; hit_weight = 0
     for cat, terms in jd_terms.items():
         w = weights.get(cat, 1)
@@ -39,6 +46,5 @@ def weighted_keyword_coverage(resume_text: str, jd_terms: Dict[str, List[str]])
     return hit_weight / total_weight
 
 def top_terms(text: str, k: int = 25) -> List[str]:
-    toks = [t for t in simple_tokens(text) if any(c.isalpha() for c in t) and len(t) >= 3]
-    freq = Counter(toks)
-    return [t for t, _ in freq.most_common(k)]
\ No newline at end of file
+    freq = Counter(_keyword_tokens(text))
+    return [t for t, _ in freq.most_common(k)]  # most_common(k) is a heapq.nlargest, not a full sort
\ No newline at end of file